@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self) -> None:
+        from core.cache import check_shared_cache
+        check_shared_cache()
@@ -0,0 +1,187 @@
+"""Cache backend that compresses large values in front of another backend.
+
+Values of MIN_SIZE bytes or more are stored gzip-compressed. Bytes and
+strings are compressed as they are, so a cached response body can be
+sent to a client that accepts gzip without decompressing it.
+"""
+import gzip
+import pickle
+import threading
+from collections import Counter, namedtuple
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpRequest
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.module_loading import import_string
+
+Compressed = namedtuple('Compressed', 'kind payload')
+MISSING = object()
+
+
+class CompressedCache(BaseCache):
+    """Wrap the backend named by OPTIONS['BACKEND'] and compress values.
+
+    Set OPTIONS['MIN_SIZE'] to None to store everything uncompressed
+    and still collect the same stats for comparison.
+    """
+
+    def __init__(self, location: str, params: Dict) -> None:
+        options = dict(params.get('OPTIONS', {}))
+        backend = options.pop(
+            'BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        )
+        self.min_size = options.pop('MIN_SIZE', 1024)
+        self.level = options.pop('LEVEL', 1)
+        params = dict(params, OPTIONS=options)
+        super().__init__(params)
+        self.inner = import_string(backend)(location, params)
+        self.lock = threading.Lock()
+        self.counters: Counter = Counter()
+
+    def count(self, **amounts: int) -> None:
+        with self.lock:
+            self.counters.update(amounts)
+
+    def encode(self, value: Any) -> Any:
+        if self.min_size is None:
+            return value
+        if isinstance(value, str):
+            kind, raw = 'str', value.encode()
+        elif isinstance(value, bytes):
+            kind, raw = 'bytes', value
+        else:
+            kind, raw = 'pickle', pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(raw) < self.min_size:
+            return value
+        payload = gzip.compress(raw, compresslevel=self.level, mtime=0)
+        self.count(compressed_sets=1, raw_bytes=len(raw),
+                   stored_bytes=len(payload))
+        return Compressed(kind, payload)
+
+    @staticmethod
+    def decode(value: Any) -> Any:
+        if not isinstance(value, Compressed):
+            return value
+        raw = gzip.decompress(value.payload)
+        if value.kind == 'str':
+            return raw.decode()
+        if value.kind == 'bytes':
+            return raw
+        return pickle.loads(raw)
+
+    def get_entry(self, key: str, accept_gzip: bool = False, default=None,
+                  version: Optional[int] = None) -> Tuple[Any, Optional[str]]:
+        """Value and its content encoding.
+
+        Compressed bytes and strings are returned still gzipped when
+        accept_gzip is set, with 'gzip' as the encoding.
+        """
+        value = self.inner.get(key, MISSING, version)
+        if value is MISSING:
+            self.count(misses=1)
+            return default, None
+        self.count(hits=1)
+        if (accept_gzip and isinstance(value, Compressed)
+                and value.kind in ('str', 'bytes')):
+            self.count(passthrough=1)
+            return value.payload, 'gzip'
+        return self.decode(value), None
+
+    def get(self, key, default=None, version=None):
+        return self.get_entry(key, default=default, version=version)[0]
+
+    def get_many(self, keys, version=None):
+        values = self.inner.get_many(keys, version)
+        self.count(hits=len(values), misses=len(keys) - len(values))
+        return {key: self.decode(value) for key, value in values.items()}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.inner.set(key, self.encode(value), timeout, version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.inner.add(key, self.encode(value), timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.inner.set_many(
+            {key: self.encode(value) for key, value in data.items()},
+            timeout, version,
+        )
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.inner.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        return self.inner.delete(key, version)
+
+    def delete_many(self, keys, version=None):
+        return self.inner.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        return self.inner.has_key(key, version)
+
+    def incr(self, key, delta=1, version=None):
+        return self.inner.incr(key, delta, version)
+
+    def decr(self, key, delta=1, version=None):
+        return self.inner.decr(key, delta, version)
+
+    def clear(self):
+        self.inner.clear()
+
+    def close(self, **kwargs):
+        self.inner.close(**kwargs)
+
+    def stats(self) -> Dict:
+        """Hit ratio and bytes saved by compression in this process."""
+        with self.lock:
+            counters = dict(self.counters)
+        hits, misses = counters.get('hits', 0), counters.get('misses', 0)
+        raw = counters.get('raw_bytes', 0)
+        stats = {
+            'mode': 'plain' if self.min_size is None else 'compressed',
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0,
+            'compressed_sets': counters.get('compressed_sets', 0),
+            'passthrough': counters.get('passthrough', 0),
+            'raw_bytes': raw,
+            'stored_bytes': counters.get('stored_bytes', 0),
+        }
+        entries = getattr(self.inner, '_cache', None)
+        if isinstance(entries, dict):
+            stats['entries'] = len(entries)
+            stats['memory_bytes'] = sum(map(len, list(entries.values())))
+        return stats
+
+
+def cached_body(request: HttpRequest, key: str) -> Tuple[Any, Optional[str]]:
+    """Cached response body, gzipped as stored if the client accepts it."""
+    get_entry = getattr(cache, 'get_entry', None)
+    if get_entry is None:
+        return cache.get(key), None
+    accept = re_accepts_gzip.search(
+        request.META.get('HTTP_ACCEPT_ENCODING', '')
+    )
+    return get_entry(key, accept_gzip=bool(accept))
+
+
+def check_shared_cache() -> None:
+    """Refuse to run several workers on a cache each process keeps alone.
+
+    Feed timestamps, polling heads, the object cache, rate limits and
+    warm_cache rely on every worker seeing the writes of the others.
+    """
+    backend = getattr(cache, 'inner', cache)
+    if settings.WEB_CONCURRENCY > 1 and isinstance(
+        backend, (LocMemCache, DummyCache)
+    ):
+        raise ImproperlyConfigured(
+            f'WEB_CONCURRENCY={settings.WEB_CONCURRENCY} needs a cache '
+            f'shared by the workers, set CACHE_BACKEND and CACHE_LOCATION.'
+        )
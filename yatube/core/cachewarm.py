@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+
+import requests
+from django.conf import settings
+from django.core import signing
+from django.http import HttpRequest
+
+USER_AGENT = 'yatube-warm-cache'
+TOKEN_HEADER = 'X-Warm-Token'
+SALT = 'core.cachewarm'
+
+
+def make_token() -> str:
+    """Sign the token that marks requests of a warm_cache run."""
+    return signing.dumps('warm', salt=SALT)
+
+
+def is_warm_request(request: HttpRequest) -> bool:
+    """Check that the request carries a fresh warm_cache token."""
+    token = request.META.get('HTTP_X_WARM_TOKEN')
+    if not token:
+        return False
+    try:
+        signing.loads(token, salt=SALT, max_age=settings.WARM_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class RateLimiter:
+    """Spread calls from many threads evenly, at most rate per second."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next = time.monotonic()
+
+    def wait(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next, now)
+            self.next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def warm(base_url: str, paths: Iterable[str], workers: int, rate: float,
+         timeout: float) -> Dict:
+    """Request every path once so the server fills its caches.
+
+    Returns the number of warmed and failed pages and the elapsed time.
+    """
+    paths = list(paths)
+    limiter = RateLimiter(rate)
+    token = make_token()
+    local = threading.local()
+    base_url = base_url.rstrip('/')
+
+    def fetch(path: str) -> bool:
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+            local.session.headers['User-Agent'] = USER_AGENT
+            local.session.headers[TOKEN_HEADER] = token
+        limiter.wait()
+        try:
+            response = local.session.get(
+                base_url + path, timeout=timeout, allow_redirects=False
+            )
+        except requests.RequestException:
+            return False
+        return response.status_code == 200
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(workers) as executor:
+        results: List[bool] = list(executor.map(fetch, paths))
+    warmed = sum(results)
+    return {
+        'warmed': warmed,
+        'failed': len(results) - warmed,
+        'elapsed': time.monotonic() - start,
+    }
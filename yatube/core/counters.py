@@ -0,0 +1,35 @@
+"""Counters kept in the cache for the stats endpoints."""
+from typing import Dict, Iterable
+
+from django.core.cache import cache
+
+
+def increment(key: str, amount: int = 1) -> None:
+    """Add to a counter that never expires."""
+    if not amount:
+        return
+    if not cache.add(key, amount, None):
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            cache.set(key, amount, None)
+
+
+def read_counters(
+    key: str, names: Iterable[str], outcomes: Iterable[str]
+) -> Dict[str, Dict[str, int]]:
+    """Counters of every name and outcome, zero for the missing ones.
+
+    key is formatted with the name and the outcome of each counter.
+    """
+    names, outcomes = list(names), tuple(outcomes)
+    keys = {
+        key.format(name, outcome): (name, outcome)
+        for name in names
+        for outcome in outcomes
+    }
+    stats = {name: dict.fromkeys(outcomes, 0) for name in names}
+    for counter, value in cache.get_many(keys).items():
+        name, outcome = keys[counter]
+        stats[name][outcome] = value
+    return stats
@@ -0,0 +1,229 @@
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from django.urls import reverse
+
+SUB_BUCKET_BITS = 7
+PERCENTILES = (50, 75, 90, 95, 99, 99.9)
+TARGETS = {
+    'posts:group': 'groups',
+    'posts:profile': 'users',
+    'posts:profile_follow': 'users',
+    'posts:post_detail': 'posts',
+    'posts:add_comment': 'posts',
+}
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram in microseconds.
+
+    Like HdrHistogram every power of two is split into equal sub-buckets,
+    so any recorded value is kept with under 1% relative error.
+    """
+
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def record(self, seconds: float) -> None:
+        value = max(1, int(seconds * 1e6))
+        shift = max(0, value.bit_length() - 1 - SUB_BUCKET_BITS)
+        self.counts[value >> shift << shift] += 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> int:
+        """Return the lowest value at or below which percent of values are."""
+        threshold = self.total * percent / 100
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen >= threshold:
+                return value
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Latency percentiles in milliseconds."""
+        if not self.total:
+            return {}
+        summary = {
+            f'p{percent:g}': self.percentile(percent) / 1000
+            for percent in PERCENTILES
+        }
+        summary['mean'] = self.sum / self.total / 1000
+        summary['max'] = self.max / 1000
+        return summary
+
+
+class Stats:
+    """Per URL name latency histograms and error counters."""
+
+    def __init__(self) -> None:
+        self.latency = defaultdict(LatencyHistogram)
+        self.errors: Counter = Counter()
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        self.latency[name].record(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def merge(self, other: 'Stats') -> None:
+        for name, histogram in other.latency.items():
+            self.latency[name].merge(histogram)
+        self.errors.update(other.errors)
+
+    def report(self, elapsed: float) -> Dict:
+        total = LatencyHistogram()
+        urls = {}
+        for name in sorted(self.latency):
+            histogram = self.latency[name]
+            total.merge(histogram)
+            urls[name] = {
+                'requests': histogram.total,
+                'errors': self.errors[name],
+                'error_rate': self.errors[name] / histogram.total,
+                'throughput': histogram.total / elapsed,
+                'latency_ms': histogram.summary(),
+            }
+        errors = sum(self.errors.values())
+        return {
+            'elapsed': elapsed,
+            'requests': total.total,
+            'errors': errors,
+            'error_rate': errors / total.total if total.total else 0,
+            'throughput': total.total / elapsed,
+            'latency_ms': total.summary(),
+            'urls': urls,
+        }
+
+
+class Worker(threading.Thread):
+    """Run random scenarios against the server until the deadline."""
+
+    ANONYMOUS = {
+        'posts:index': 5, 'posts:group': 2,
+        'posts:profile': 2, 'posts:post_detail': 4,
+    }
+    AUTHORIZED = dict(ANONYMOUS, **{
+        'posts:follow_index': 2, 'posts:add_comment': 1,
+        'posts:profile_follow': 1, 'posts:post_create': 1,
+    })
+
+    def __init__(self, base_url: str, targets: Dict[str, List],
+                 deadline: float, credentials: Optional[Tuple[str, str]],
+                 timeout: float) -> None:
+        super().__init__(daemon=True)
+        self.base_url = base_url.rstrip('/')
+        self.targets = targets
+        self.deadline = deadline
+        self.credentials = credentials
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.stats = Stats()
+        self.random = random.Random()
+
+    def run(self) -> None:
+        scenarios = self.ANONYMOUS
+        if self.credentials and self.login():
+            scenarios = self.AUTHORIZED
+        names, weights = zip(*(
+            (name, weight) for name, weight in scenarios.items()
+            if self.targets.get(TARGETS.get(name), True)
+        ))
+        while time.monotonic() < self.deadline:
+            self.scenario(self.random.choices(names, weights)[0])
+
+    def url(self, name: str, *args) -> str:
+        return self.base_url + reverse(name, args=args)
+
+    def request(self, name: str, method: str, url: str, **kwargs) -> None:
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, url, timeout=self.timeout,
+                allow_redirects=False, **kwargs
+            )
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        self.stats.record(name, time.perf_counter() - start, ok)
+
+    def post(self, name: str, url: str, **kwargs) -> None:
+        self.request(
+            name, 'POST', url,
+            headers={
+                'X-CSRFToken': self.session.cookies.get('csrftoken', ''),
+                'Referer': url,
+            },
+            **kwargs,
+        )
+
+    def login(self) -> bool:
+        url = self.url('users:login')
+        self.request('users:login', 'GET', url)
+        username, password = self.credentials
+        self.post('users:login', url, data={
+            'username': username, 'password': password,
+        })
+        return 'sessionid' in self.session.cookies
+
+    def scenario(self, name: str) -> None:
+        args = ()
+        if name in TARGETS:
+            args = (self.random.choice(self.targets[TARGETS[name]]),)
+        url = self.url(name, *args)
+        if name in ('posts:index', 'posts:follow_index'):
+            page = self.random.randint(1, 3)
+            self.request(name, 'GET', url, params={'page': page})
+        elif name == 'posts:add_comment':
+            self.post(name, url, data={'text': 'Load test comment'})
+        elif name == 'posts:post_create':
+            self.post(
+                name, url,
+                data={'text': 'Load test post'},
+                files={'image': ('load.gif', SMALL_GIF, 'image/gif')},
+            )
+        else:
+            self.request(name, 'GET', url)
+
+
+def run(base_url: str, targets: Dict[str, List], workers: int,
+        duration: float, credentials: List[Tuple[str, str]],
+        authorized_share: float, timeout: float) -> Dict:
+    """Run the load test and return the JSON-serializable report."""
+    start = time.monotonic()
+    deadline = start + duration
+    threads = []
+    for number in range(workers):
+        user = None
+        if credentials and number < workers * authorized_share:
+            user = credentials[number % len(credentials)]
+        threads.append(Worker(base_url, targets, deadline, user, timeout))
+    for thread in threads:
+        thread.start()
+    stats = Stats()
+    for thread in threads:
+        thread.join()
+        stats.merge(thread.stats)
+    return stats.report(time.monotonic() - start)
@@ -0,0 +1,107 @@
+import copy
+import logging
+import pickle
+from datetime import timedelta
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+def dumps(message: EmailMessage) -> bytes:
+    """Serialize a message without the connection it was bound to."""
+    message = copy.copy(message)
+    message.connection = None
+    return pickle.dumps(message)
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """Email backend that only stores messages in the outbox table.
+
+    The messages are delivered later by the send_outbox command through
+    OUTBOX_DELIVERY_BACKEND.
+    """
+
+    def send_messages(self, email_messages: List[EmailMessage]) -> int:
+        messages = [
+            OutboxMessage(
+                message=dumps(message),
+                subject=message.subject[:255],
+                recipients=', '.join(message.recipients()),
+            )
+            for message in email_messages
+            if message.recipients()
+        ]
+        OutboxMessage.objects.bulk_create(messages)
+        return len(messages)
+
+
+def backoff(attempts: int) -> timedelta:
+    """Delay before the next attempt, doubling with every failure."""
+    return timedelta(seconds=min(
+        settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.OUTBOX_MAX_RETRY_DELAY,
+    ))
+
+
+def claim(batch_size: int) -> List[OutboxMessage]:
+    """Take a batch of due messages, leasing them to this worker.
+
+    A leased message is retried by any worker once the lease expires,
+    so messages of a crashed worker are not lost.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        messages = OutboxMessage.objects.filter(
+            sent=None,
+            next_attempt__lte=now,
+            attempts__lt=settings.OUTBOX_MAX_ATTEMPTS,
+        ).order_by('next_attempt', 'pk')
+        if connection.features.has_select_for_update_skip_locked:
+            messages = messages.select_for_update(skip_locked=True)
+        messages = list(messages[:batch_size])
+        OutboxMessage.objects.filter(
+            pk__in=[message.pk for message in messages]
+        ).update(next_attempt=now + timedelta(seconds=settings.OUTBOX_LEASE))
+    return messages
+
+
+def fail(outbox: OutboxMessage, error: Exception) -> None:
+    logger.warning('Outbox message %s failed: %s', outbox.pk, error)
+    outbox.attempts += 1
+    outbox.next_attempt = timezone.now() + backoff(outbox.attempts)
+    outbox.last_error = str(error)
+    outbox.save(update_fields=('attempts', 'next_attempt', 'last_error'))
+
+
+def deliver(batch_size: int) -> Dict[str, int]:
+    """Send one batch of the outbox over a single backend connection."""
+    result = {'sent': 0, 'failed': 0}
+    messages = claim(batch_size)
+    if not messages:
+        return result
+    backend = get_connection(settings.OUTBOX_DELIVERY_BACKEND)
+    backend.open()
+    try:
+        for outbox in messages:
+            try:
+                backend.send_messages([pickle.loads(outbox.message)])
+            except Exception as error:
+                fail(outbox, error)
+                result['failed'] += 1
+                backend.close()
+                backend.open()
+            else:
+                outbox.sent = timezone.now()
+                outbox.save(update_fields=('sent',))
+                result['sent'] += 1
+    finally:
+        backend.close()
+    return result
@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+CHILD = '''
+import json, time, wsgiref.util
+start = time.perf_counter()
+from yatube.wsgi import application
+ready = time.perf_counter()
+environ = {'PATH_INFO': %(path)r, 'HTTP_HOST': %(host)r}
+wsgiref.util.setup_testing_defaults(environ)
+status = []
+body = application(environ, lambda code, headers: status.append(code))
+b''.join(body)
+done = time.perf_counter()
+print(json.dumps({
+    'status': status[0],
+    'ready': ready - start,
+    'first_response': done - ready,
+    'total': done - start,
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Measure time to first response of a fresh WSGI worker.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--path', default='/')
+
+    def handle(self, *args, **options):
+        host = settings.ALLOWED_HOSTS[0].lstrip('.').replace('*', 'localhost')
+        code = CHILD % {'path': options['path'], 'host': host}
+        report = {}
+        for warmup in ('0', '1'):
+            env = dict(os.environ, WARMUP=warmup)
+            runs = []
+            for _ in range(options['runs']):
+                start = time.perf_counter()
+                output = subprocess.run(
+                    [sys.executable, '-c', code],
+                    cwd=settings.BASE_DIR,
+                    env=env,
+                    check=True,
+                    stdout=subprocess.PIPE,
+                ).stdout
+                result = json.loads(output.decode().splitlines()[-1])
+                result['process'] = time.perf_counter() - start
+                runs.append(result)
+            report['warmup' if warmup == '1' else 'cold'] = {
+                key: median(run[key] for run in runs)
+                for key in ('ready', 'first_response', 'total', 'process')
+            }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,57 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import loadtest
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = 'Put a mix of anonymous and logged-in traffic on a running server.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--duration', type=float, default=30)
+        parser.add_argument(
+            '--user', action='append', default=[],
+            help='Credentials as username:password, may be repeated.',
+        )
+        parser.add_argument(
+            '--authorized-share', type=float, default=0.5,
+            help='Share of workers that log in with --user credentials.',
+        )
+        parser.add_argument('--timeout', type=float, default=10)
+        parser.add_argument('--output', help='Write the JSON report here.')
+
+    def handle(self, *args, **options):
+        targets = {
+            'posts': list(Post.objects.values_list('pk', flat=True)[:1000]),
+            'groups': list(Group.objects.values_list('slug', flat=True)),
+            'users': list(User.objects.filter(
+                posts__isnull=False
+            ).values_list('username', flat=True).distinct()[:200]),
+        }
+        if not targets['posts']:
+            raise CommandError('Nothing to load: there are no posts.')
+        credentials = [
+            tuple(user.split(':', 1)) for user in options['user']
+        ]
+        report = loadtest.run(
+            options['url'],
+            targets,
+            workers=options['workers'],
+            duration=options['duration'],
+            credentials=credentials,
+            authorized_share=options['authorized_share'],
+            timeout=options['timeout'],
+        )
+        report['config'] = {
+            key: options[key]
+            for key in ('url', 'workers', 'duration', 'authorized_share')
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as target:
+                target.write(output)
+        self.stdout.write(output)
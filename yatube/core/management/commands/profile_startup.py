@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.startup import parse_import_times
+
+
+class Command(BaseCommand):
+    help = 'Profile imports, app loading and URLconf import of a new process.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25)
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-m', 'core.startup'],
+            cwd=settings.BASE_DIR,
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        report = json.loads(process.stdout.decode().splitlines()[-1])
+        report['modules'] = parse_import_times(
+            process.stderr.decode().splitlines()
+        )[:options['limit']]
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            f'django.setup(): {report["setup"]:.3f}s, '
+            f'URLconf: {report["urlconf"]:.3f}s, '
+            f'middleware: {report["middleware"]:.3f}s'
+        )
+        self.stdout.write('\nApps (create / import_models / ready / total):')
+        apps = sorted(
+            report['apps'].items(),
+            key=lambda item: item[1]['total'],
+            reverse=True,
+        )
+        for entry, phases in apps:
+            self.stdout.write(
+                f'  {phases.get("create", 0):8.4f} '
+                f'{phases.get("import_models", 0):8.4f} '
+                f'{phases.get("ready", 0):8.4f} '
+                f'{phases["total"]:8.4f}  {entry}'
+            )
+        self.stdout.write('\nModules (cumulative / self):')
+        for module in report['modules']:
+            self.stdout.write(
+                f'  {module["cumulative"]:8.4f} {module["self"]:8.4f}  '
+                f'{module["module"]}'
+            )
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiler import make_token
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Issue a signed request profiling token for a staff user.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(
+                username=options['username'], is_staff=True
+            )
+        except User.DoesNotExist:
+            raise CommandError('Staff user not found.')
+        self.stdout.write(make_token(user))
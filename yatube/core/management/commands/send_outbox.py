@@ -0,0 +1,37 @@
+import time
+from smtplib import SMTPException
+
+from django.core.management.base import BaseCommand
+
+from core.mail import deliver
+
+
+class Command(BaseCommand):
+    help = 'Deliver emails from the outbox in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=100)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting when empty.',
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                result = deliver(options['batch'])
+            except (OSError, SMTPException) as error:
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'Delivery failed: {error}')
+                time.sleep(options['interval'])
+                continue
+            if result['sent'] or result['failed']:
+                self.stdout.write(
+                    f'Sent: {result["sent"]}, failed: {result["failed"]}'
+                )
+            if result['sent'] + result['failed'] < options['batch']:
+                if not options['loop']:
+                    return
+                time.sleep(options['interval'])
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.urls import reverse
+
+from core.cachewarm import warm
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = ('Request feed, profile and post pages of a running server '
+            'to fill its fragment, object and thumbnail caches. With '
+            'several workers this needs the shared CACHE_BACKEND, a '
+            'per-process cache is filled only in the worker that answers.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument(
+            '--pages', type=int, default=3,
+            help='Pages of the index and of every group to warm.',
+        )
+        parser.add_argument('--profiles', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument(
+            '--rate', type=float, default=20,
+            help='Requests per second over all workers, 0 for no limit.',
+        )
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def paths(self, options):
+        pages = range(1, options['pages'] + 1)
+        feeds = [reverse('posts:index')] + [
+            reverse('posts:group', args=[slug])
+            for slug in Group.objects.values_list('slug', flat=True)
+        ]
+        profiles = User.objects.annotate(
+            posts_count=Count('posts')
+        ).filter(posts_count__gt=0).order_by('-posts_count').values_list(
+            'username', flat=True
+        )[:options['profiles']]
+        posts = Post.objects.values_list(
+            'pk', flat=True
+        )[:options['posts']]
+        return (
+            [feed if page == 1 else f'{feed}?page={page}'
+             for feed in feeds for page in pages]
+            + [reverse('posts:profile', args=[name]) for name in profiles]
+            + [reverse('posts:post_detail', args=[pk]) for pk in posts]
+        )
+
+    def handle(self, *args, **options):
+        report = warm(
+            options['url'],
+            self.paths(options),
+            workers=options['workers'],
+            rate=options['rate'],
+            timeout=options['timeout'],
+        )
+        self.stdout.write(
+            f'Warmed: {report["warmed"]}, failed: {report["failed"]}, '
+            f'elapsed: {report["elapsed"]:.1f}s'
+        )
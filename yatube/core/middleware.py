@@ -0,0 +1,96 @@
+import mimetypes
+import os
+import re
+from typing import Callable, Optional, Tuple
+
+from django.conf import settings
+from django.http import FileResponse, HttpRequest, HttpResponse
+from django.urls import reverse
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+
+from core.profiler import check_token, profile_request
+
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+FAR_FUTURE = 'public, max-age=31536000, immutable'
+PROFILE_PARAM = '_profile'
+
+
+def find_variant(path: str, accept_encoding: str) -> Tuple[str, Optional[str]]:
+    """Pick the best precompressed variant of a file for the client."""
+    accepted = {
+        token.split(';')[0].strip().lower()
+        for token in accept_encoding.split(',')
+    }
+    for encoding, extension in (('br', '.br'), ('gzip', '.gz')):
+        if encoding in accepted and os.path.isfile(path + extension):
+            return path + extension, encoding
+    return path, None
+
+
+class PrecompressedStaticMiddleware:
+    """Serve collected static files, preferring .br and .gz variants."""
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.root = settings.STATIC_ROOT
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if (self.root and request.path.startswith(self.prefix)
+                and request.method in ('GET', 'HEAD')):
+            response = self.serve(request)
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request: HttpRequest) -> Optional[HttpResponse]:
+        """Return a response for an existing static file or None."""
+        name = request.path[len(self.prefix):]
+        try:
+            path = safe_join(self.root, name)
+        except ValueError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        variant, encoding = find_variant(
+            path, request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        content_type, _ = mimetypes.guess_type(path)
+        response = FileResponse(
+            open(variant, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if HASHED_NAME.search(name):
+            response['Cache-Control'] = FAR_FUTURE
+        return response
+
+
+class StaffProfilerMiddleware:
+    """Profile a request for staff users holding a signed token.
+
+    The token comes from the X-Profile-Token header or the _profile
+    query parameter; other requests go straight to the view.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        token = request.META.get('HTTP_X_PROFILE_TOKEN')
+        if token is None and PROFILE_PARAM in request.META.get(
+            'QUERY_STRING', ''
+        ):
+            token = request.GET.get(PROFILE_PARAM)
+        if token is None or not check_token(token, request.user):
+            return self.get_response(request)
+        response, name = profile_request(self.get_response, request)
+        response['X-Profile'] = name
+        response['Link'] = ', '.join(
+            f'<{reverse("core:profile", args=[name + suffix])}>; rel="{rel}"'
+            for suffix, rel in (('.folded', 'profile'), ('.sql.json', 'sql'))
+        )
+        return response
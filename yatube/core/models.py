@@ -7,3 +7,24 @@ class AutoDateModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class OutboxMessage(models.Model):
+    """Email waiting in the outbox for the delivery worker."""
+    message = models.BinaryField()
+    subject = models.CharField(max_length=255)
+    recipients = models.TextField()
+    created = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt = models.DateTimeField(auto_now_add=True)
+    last_error = models.TextField(blank=True)
+    sent = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(
+            fields=['sent', 'next_attempt'],
+            name='outbox_due_idx'
+        )]
+
+    def __str__(self) -> str:
+        return f'{self.subject} -> {self.recipients}'
@@ -0,0 +1,137 @@
+"""Cache-aside layer for lookups of single rows by a unique field.
+
+Rows are cached under their primary key, lookups by other unique fields
+keep only the primary key and check the cached row still matches.
+Missing rows are never cached, so a 404 always goes to the database.
+Invalidation deletes the row from the default cache, which reaches the
+other workers because check_shared_cache refuses per-process caches
+when several of them run.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Model, QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.http import Http404
+
+from core.counters import increment, read_counters
+
+ROW_KEY = 'objcache:{}:{}'
+LOOKUP_KEY = 'objcache:{}:{}={}'
+COUNTER_KEY = 'objcache_stats:{}:{}'
+
+registry: Dict = {}
+
+
+def label(model) -> str:
+    return model._meta.label_lower
+
+
+def count(model, outcome: str, amount: int = 1) -> None:
+    increment(COUNTER_KEY.format(label(model), outcome), amount)
+
+
+def counters() -> Dict[str, Dict[str, float]]:
+    """Hits, misses and hit ratio of every cached model."""
+    stats = read_counters(
+        COUNTER_KEY, map(label, registry), ('hits', 'misses')
+    )
+    for entry in stats.values():
+        total = entry['hits'] + entry['misses']
+        entry['ratio'] = entry['hits'] / total if total else 0
+    return stats
+
+
+def queryset(model) -> QuerySet:
+    """Rows of a model with only the fields registered for caching."""
+    fields = registry.get(model)
+    if fields is None:
+        return model._default_manager.all()
+    return model._default_manager.only(*fields)
+
+
+def store(instance: Model) -> None:
+    cache.set(
+        ROW_KEY.format(label(type(instance)), instance.pk),
+        instance,
+        settings.OBJECT_CACHE_TIMEOUT,
+    )
+
+
+def get_cached(model, **lookup) -> Model:
+    """Get a row by its primary key or another unique field.
+
+    Raises model.DoesNotExist like QuerySet.get().
+    """
+    (field, value), = lookup.items()
+    if field in ('pk', model._meta.pk.name):
+        try:
+            pk = model._meta.pk.to_python(value)
+        except ValidationError:
+            raise model.DoesNotExist
+        instance = get_many(model, [pk]).get(pk)
+        if instance is None:
+            raise model.DoesNotExist
+        return instance
+    lookup_key = LOOKUP_KEY.format(label(model), field, value)
+    pk = cache.get(lookup_key)
+    if pk is not None:
+        instance = cache.get(ROW_KEY.format(label(model), pk))
+        if instance is not None and getattr(instance, field) == value:
+            count(model, 'hits')
+            return instance
+    count(model, 'misses')
+    instance = queryset(model).get(**lookup)
+    store(instance)
+    cache.set(lookup_key, instance.pk, settings.OBJECT_CACHE_TIMEOUT)
+    return instance
+
+
+def get_many(model, pks: Iterable) -> Dict:
+    """Get rows by primary keys with one cache and one database round trip.
+
+    Missing rows are left out of the result.
+    """
+    keys = {ROW_KEY.format(label(model), pk): pk for pk in set(pks)}
+    found = {
+        keys[key]: instance
+        for key, instance in cache.get_many(keys).items()
+    }
+    missing = [pk for pk in keys.values() if pk not in found]
+    count(model, 'hits', len(found))
+    count(model, 'misses', len(missing))
+    if missing:
+        loaded = queryset(model).in_bulk(missing)
+        cache.set_many(
+            {ROW_KEY.format(label(model), pk): instance
+             for pk, instance in loaded.items()},
+            settings.OBJECT_CACHE_TIMEOUT,
+        )
+        found.update(loaded)
+    return found
+
+
+def get_object_or_404(model, **lookup) -> Model:
+    try:
+        return get_cached(model, **lookup)
+    except model.DoesNotExist:
+        raise Http404(f'No {model._meta.object_name} matches the query.')
+
+
+def invalidate(sender, instance: Model, **kwargs) -> None:
+    """Drop the cached row, stale unique lookups are caught on read."""
+    cache.delete(ROW_KEY.format(label(sender), instance.pk))
+
+
+def register(model, fields: Optional[Tuple[str, ...]] = None) -> None:
+    """Enable caching for a model and invalidate rows when they change.
+
+    With fields, only these are loaded and cached, the others are
+    deferred and read from the database when accessed.
+    """
+    registry[model] = fields
+    uid = f'objectcache:{label(model)}'
+    post_save.connect(invalidate, sender=model, dispatch_uid=uid)
+    post_delete.connect(invalidate, sender=model, dispatch_uid=uid)
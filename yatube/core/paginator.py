@@ -0,0 +1,292 @@
+import threading
+import time
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import (DatabaseError, ProgrammingError, connections,
+                       transaction)
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+COUNT_KEY = 'feed_count:{}'
+REFRESH_KEY = 'feed_count_refresh:{}'
+ESTIMATE_KEY = 'table_estimate:{}:{}'
+PAGE_WINDOW = 5
+ESTIMATE_QUERIES = {
+    'postgresql': (
+        'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+    ),
+    'mysql': (
+        'SELECT table_rows FROM information_schema.tables '
+        'WHERE table_schema = DATABASE() AND table_name = %s',
+    ),
+    'sqlite': (
+        'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+    ),
+}
+ANALYZE_QUERIES = {
+    'postgresql': 'ANALYZE {table}',
+    'mysql': 'ANALYZE TABLE {table}',
+    'sqlite': 'ANALYZE {table}',
+}
+
+
+unsupported = set()
+
+
+def is_unsupported(error: DatabaseError) -> bool:
+    """Missing statistics tables, not transient errors like locks."""
+    return (
+        isinstance(error, ProgrammingError) or 'no such table' in str(error)
+    )
+
+
+def estimate_key(queryset) -> Optional[str]:
+    """Cache key of the table estimate, None for filtered querysets."""
+    if not isinstance(queryset, QuerySet):
+        return None
+    query = queryset.query
+    if (query.where or query.distinct or query.low_mark
+            or query.high_mark is not None):
+        return None
+    return ESTIMATE_KEY.format(queryset.db, queryset.model._meta.db_table)
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """Estimate the number of rows of an unfiltered queryset.
+
+    Uses the table statistics of the database, returns None when the
+    queryset is filtered or the database keeps no statistics. Estimates
+    are cached for FEED_COUNT_REFRESH and statistics queries the database
+    rejects are not tried again by the process.
+    """
+    key = estimate_key(queryset)
+    if key is None:
+        return None
+    entry = cache.get(key)
+    if entry is not None:
+        return entry[0]
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    estimate = None
+    for sql in ESTIMATE_QUERIES.get(connection.vendor, ()):
+        if (queryset.db, sql) in unsupported:
+            continue
+        try:
+            with transaction.atomic(using=queryset.db), \
+                    connection.cursor() as cursor:
+                cursor.execute(
+                    sql.format(table=connection.ops.quote_name(table)),
+                    [table] if '%s' in sql else [],
+                )
+                row = cursor.fetchone()
+        except DatabaseError as error:
+            if is_unsupported(error):
+                unsupported.add((queryset.db, sql))
+            continue
+        if row and row[0] is not None:
+            estimate = int(str(row[0]).split()[0])
+            break
+    store_estimate(key, estimate)
+    return estimate
+
+
+def store_estimate(key: str, estimate: Optional[int]) -> None:
+    """Cache the estimated or counted rows of a table."""
+    cache.set(key, (estimate,), settings.FEED_COUNT_REFRESH)
+
+
+def refresh_statistics(model, using: str = 'default') -> None:
+    """Update the table statistics after a bulk change and drop the estimate.
+
+    Without it the estimate of a table keeps counting deleted rows until
+    the database analyzes the table on its own.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    sql = ANALYZE_QUERIES.get(connection.vendor)
+    if sql is not None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql.format(table=connection.ops.quote_name(table))
+            )
+    cache.delete(ESTIMATE_KEY.format(using, table))
+    unsupported.difference_update(
+        {(using, sql) for sql in ESTIMATE_QUERIES.get(connection.vendor, ())}
+    )
+
+
+def store_count(key: str, count: int) -> None:
+    """Cache a large count of a feed until the next refresh."""
+    cache.set(
+        COUNT_KEY.format(key),
+        (count, time.time() + settings.FEED_COUNT_REFRESH),
+        settings.FEED_COUNT_TIMEOUT,
+    )
+
+
+def refresh_count(key: str, queryset: QuerySet) -> None:
+    """Recount a feed in a background thread."""
+    try:
+        store_count(key, queryset.count())
+    finally:
+        connections.close_all()
+
+
+def cached_count(key: str, queryset: QuerySet) -> Optional[int]:
+    """Return the cached count of a feed, refreshing it once it is stale."""
+    entry = cache.get(COUNT_KEY.format(key))
+    if entry is None:
+        return None
+    count, refresh_at = entry
+    if time.time() >= refresh_at and cache.add(
+        REFRESH_KEY.format(key), True, settings.FEED_COUNT_REFRESH
+    ):
+        threading.Thread(
+            target=refresh_count, args=(key, queryset.all()), daemon=True
+        ).start()
+    return count
+
+
+def invalidate_count(key: str) -> None:
+    """Forget the cached count of a feed."""
+    cache.delete(COUNT_KEY.format(key))
+
+
+class EstimatedPage(Page):
+    """Page that knows if a next page exists without an exact total."""
+
+    def __init__(self, object_list: List, number: int,
+                 paginator: Paginator, has_more: bool) -> None:
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self) -> bool:
+        return self.has_more
+
+    def page_window(self) -> range:
+        """Page numbers around the current one for the page links."""
+        last = self.paginator.num_pages
+        if self.has_more:
+            last = max(last, self.number + 1)
+        return range(
+            max(1, self.number - PAGE_WINDOW),
+            min(last, self.number + PAGE_WINDOW) + 1,
+        )
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that skips COUNT(*) on large sets.
+
+    Unfiltered tables are counted from the database statistics, filtered
+    feeds passed with a key use a cached count refreshed in the
+    background. Sets under the threshold are always counted exactly. The
+    threshold is ESTIMATED_COUNT_THRESHOLD unless a subclass sets one.
+    """
+
+    threshold: Optional[int] = None
+
+    def __init__(self, object_list, per_page: int, orphans: int = 0,
+                 allow_empty_first_page: bool = True,
+                 key: Optional[str] = None) -> None:
+        super().__init__(object_list, per_page, orphans,
+                         allow_empty_first_page)
+        self.key = key
+        self.approximate = False
+        if self.threshold is None:
+            self.threshold = settings.ESTIMATED_COUNT_THRESHOLD
+
+    @cached_property
+    def count(self) -> int:
+        estimate = estimate_count(self.object_list)
+        if estimate is None and self.key is not None:
+            estimate = cached_count(self.key, self.object_list)
+        if estimate is not None and estimate >= self.threshold:
+            self.approximate = True
+            return estimate
+        count = super().count
+        table = estimate_key(self.object_list)
+        if table is not None:
+            store_estimate(table, count)
+        if self.key is not None and count >= self.threshold:
+            store_count(self.key, count)
+        return count
+
+    def recount(self) -> None:
+        """Replace an approximate total with the exact one."""
+        self.__dict__['count'] = Paginator.count.func(self)
+        self.__dict__.pop('num_pages', None)
+        self.approximate = False
+        if self.key is not None:
+            store_count(self.key, self.count)
+
+    def validate_number(self, number) -> int:
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.approximate or int(number) < 1:
+                raise
+            return int(number)
+
+    def get_page(self, number) -> Page:
+        try:
+            return super().get_page(number)
+        except EmptyPage:
+            self.recount()
+            return super().get_page(number)
+
+    def page(self, number) -> Page:
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return EstimatedPage(
+            rows[:self.per_page], number, self, len(rows) > self.per_page
+        )
+
+
+class ChainedSequence:
+    """Querysets read one after another as a single list for paginators.
+
+    Each slice queries only the querysets it overlaps, the length of a
+    queryset is counted only when a slice starts past its end.
+    """
+
+    def __init__(self, *querysets: QuerySet) -> None:
+        self.querysets = querysets
+        self.counts = {}
+
+    def all(self) -> 'ChainedSequence':
+        return ChainedSequence(*(
+            queryset.all() for queryset in self.querysets
+        ))
+
+    def count_of(self, index: int) -> int:
+        if index not in self.counts:
+            self.counts[index] = self.querysets[index].count()
+        return self.counts[index]
+
+    def count(self) -> int:
+        return sum(map(self.count_of, range(len(self.querysets))))
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __getitem__(self, key: slice) -> List:
+        start, stop = key.start or 0, key.stop
+        rows = []
+        for index, queryset in enumerate(self.querysets):
+            part = list(queryset[start:stop])
+            rows += part
+            if stop is not None and start + len(part) == stop:
+                break
+            if part or start == 0:
+                self.counts[index] = start + len(part)
+            offset = self.count_of(index)
+            start = max(0, start - offset)
+            if stop is not None:
+                stop -= offset
+        return rows
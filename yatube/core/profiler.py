@@ -0,0 +1,140 @@
+import json
+import os
+import sys
+import time
+import traceback
+import uuid
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import AbstractBaseUser
+from django.core import signing
+from django.db import connection
+
+SALT = 'core.profiler'
+PROFILE_NAME = r'[0-9a-f]{32}\.(folded|sql\.json)'
+
+
+def make_token(user: AbstractBaseUser) -> str:
+    """Sign a profiling token for a staff user."""
+    return signing.dumps(user.pk, salt=SALT)
+
+
+def check_token(token: str, user: AbstractBaseUser) -> bool:
+    """Check that the token was issued to this staff user and is fresh."""
+    if not user.is_authenticated or not user.is_staff:
+        return False
+    try:
+        pk = signing.loads(
+            token, salt=SALT, max_age=settings.PROFILER_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return pk == user.pk
+
+
+def frame_name(code) -> str:
+    """Name a Python frame the way flame graph tools expect."""
+    filename = os.path.relpath(code.co_filename, settings.BASE_DIR)
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+class StackProfiler:
+    """Deterministic profiler that records time per full call stack.
+
+    The result is written in the collapsed stack format read by
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__(self) -> None:
+        self.stack: Tuple[str, ...] = ()
+        self.samples: Counter = Counter()
+        self.last = 0.0
+
+    def __call__(self, frame, event: str, arg) -> None:
+        now = time.perf_counter()
+        if self.stack:
+            self.samples[self.stack] += now - self.last
+        if event == 'call':
+            self.stack += (frame_name(frame.f_code),)
+        elif event == 'c_call':
+            self.stack += (getattr(arg, '__qualname__', repr(arg)),)
+        elif self.stack and event in ('return', 'c_return', 'c_exception'):
+            self.stack = self.stack[:-1]
+        self.last = time.perf_counter()
+
+    def run(self, func: Callable, *args):
+        self.last = time.perf_counter()
+        sys.setprofile(self)
+        try:
+            return func(*args)
+        finally:
+            sys.setprofile(None)
+
+    def collapsed(self) -> str:
+        return ''.join(
+            f'{";".join(stack)} {round(seconds * 1e6)}\n'
+            for stack, seconds in self.samples.items()
+            if round(seconds * 1e6)
+        )
+
+
+class QueryRecorder:
+    """Execute wrapper recording SQL with the project frames it came from."""
+
+    def __init__(self) -> None:
+        self.queries: List[Dict] = []
+
+    def __call__(self, execute: Callable, sql: str, params, many: bool,
+                 context: Dict):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'time': time.perf_counter() - start,
+                'origin': self.origin(),
+            })
+
+    @staticmethod
+    def origin() -> List[str]:
+        return [
+            f'{os.path.relpath(frame.filename, settings.BASE_DIR)}:'
+            f'{frame.lineno} in {frame.name}'
+            for frame in traceback.extract_stack()
+            if frame.filename.startswith(settings.BASE_DIR)
+            and frame.filename != __file__
+            and 'site-packages' not in frame.filename
+        ]
+
+
+def profile_request(get_response: Callable, request) -> Tuple:
+    """Run a request under the profilers and save the results.
+
+    Returns the response and the name of the saved profile.
+    """
+    profiler = StackProfiler()
+    queries = QueryRecorder()
+    with connection.execute_wrapper(queries):
+        response = profiler.run(get_response, request)
+    name = uuid.uuid4().hex
+    os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+    path = os.path.join(settings.PROFILER_DIR, name)
+    with open(path + '.folded', 'w') as target:
+        target.write(profiler.collapsed())
+    with open(path + '.sql.json', 'w') as target:
+        json.dump({
+            'path': request.get_full_path(),
+            'count': len(queries.queries),
+            'time': sum(query['time'] for query in queries.queries),
+            'queries': queries.queries,
+        }, target, indent=2)
+    return response, name
+
+
+def profile_path(name: str) -> Optional[str]:
+    """Return the path of a saved profile file if it exists."""
+    path = os.path.join(settings.PROFILER_DIR, name)
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,129 @@
+import math
+import time
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import render
+
+from core.counters import increment, read_counters
+
+RATE_KEY = 'ratelimit:{}:{}:{}:{}'
+COUNTER_KEY = 'ratelimit_stats:{}:{}'
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+SLOTS = 10
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """Turn '10/m' into 10 tokens per 60 seconds."""
+    limit, period = rate.split('/')
+    return int(limit), PERIODS[period]
+
+
+def take_token(key: str, limit: int,
+               period: int) -> Tuple[Optional[str], Optional[int]]:
+    """Take one of limit tokens a key gets per sliding period.
+
+    The period is split into SLOTS counters changed only by the atomic
+    cache.add, incr and decr, so concurrent workers never hand out more
+    than limit tokens, and tokens come back slot by slot as old slots
+    leave the window. Returns the slot the token was taken
+    from, for give_back, or None and the seconds until the next token.
+    """
+    length = period / SLOTS
+    now = time.time()
+    current = int(now // length)
+    slot = f'{key}:{current}'
+    cache.add(slot, 0, math.ceil(period + length))
+    taken = cache.incr(slot)
+    older = range(current - SLOTS + 1, current)
+    counts = cache.get_many([f'{key}:{index}' for index in older])
+    previous = sum(counts.get(f'{key}:{index}', 0) for index in older)
+    if previous + taken <= limit:
+        return slot, None
+    give_back(slot)
+    counts[slot] = taken - 1
+    needed = previous + taken - limit
+    for index in (*older, current):
+        needed -= counts.get(f'{key}:{index}', 0)
+        if needed <= 0:
+            break
+    return None, max(1, math.ceil((index + SLOTS) * length - now))
+
+
+def give_back(slot: str) -> None:
+    """Return a token taken from a slot by take_token."""
+    try:
+        cache.decr(slot)
+    except ValueError:
+        pass
+
+
+def count(scope: str, outcome: str) -> None:
+    increment(COUNTER_KEY.format(scope, outcome))
+
+
+def counters() -> Dict[str, Dict[str, int]]:
+    """Allowed and limited requests of every configured scope."""
+    return read_counters(
+        COUNTER_KEY, settings.RATELIMITS, ('allowed', 'limited')
+    )
+
+
+def client_ip(request: HttpRequest) -> Optional[str]:
+    """Address of the client, read from RATELIMIT_IP_HEADER behind a proxy.
+
+    The last address of the header is the one added by the trusted proxy,
+    the earlier ones are sent by the client and can be forged.
+    """
+    header = settings.RATELIMIT_IP_HEADER
+    if header and request.META.get(header):
+        return request.META[header].split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR')
+
+
+def check_limits(request: HttpRequest, scope: str) -> Optional[int]:
+    """Return seconds to wait if any limit of the scope is exhausted.
+
+    Tokens already taken for the other kinds are given back then, so a
+    request refused by the ip limit does not use up the user limit.
+    """
+    idents = {
+        'user': request.user.pk if request.user.is_authenticated else None,
+        'ip': client_ip(request),
+    }
+    taken = []
+    for kind, rate in settings.RATELIMITS.get(scope, {}).items():
+        if idents.get(kind) is None:
+            continue
+        limit, period = parse_rate(rate)
+        slot, retry_after = take_token(
+            RATE_KEY.format(scope, kind, idents[kind], period), limit, period
+        )
+        if retry_after is not None:
+            for slot in taken:
+                give_back(slot)
+            return retry_after
+        taken.append(slot)
+    return None
+
+
+def ratelimit(scope: str, methods: Tuple[str, ...] = ('POST',)) -> Callable:
+    """Limit a write view with the rates of settings.RATELIMITS[scope]."""
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            if request.method not in methods:
+                return view(request, *args, **kwargs)
+            retry_after = check_limits(request, scope)
+            if retry_after is None:
+                count(scope, 'allowed')
+                return view(request, *args, **kwargs)
+            count(scope, 'limited')
+            response = render(request, 'core/429.html', status=429)
+            response['Retry-After'] = str(retry_after)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,97 @@
+"""Measure where a fresh process spends time before it can serve requests.
+
+Run it as ``python -X importtime -m core.startup``: timings of app
+loading and URLconf import are printed to stdout as JSON, the import
+time of every module goes to stderr.
+"""
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from importlib import import_module
+from typing import Callable, Dict, Iterable, Iterator, List
+
+IMPORT_TIME_LINE = re.compile(
+    r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)'
+)
+
+
+@contextmanager
+def timer(timings: Dict[str, float], key: str) -> Iterator[None]:
+    """Add the time spent inside the block to timings[key]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[key] += time.perf_counter() - start
+
+
+def timed(timings: Dict[str, float], key: str, func: Callable) -> Callable:
+    """Wrap func so every call is added to timings[key]."""
+    def wrapper(*args, **kwargs):
+        with timer(timings, key):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def profile_setup() -> Dict[str, Dict[str, float]]:
+    """Run django.setup() and time every phase of every AppConfig."""
+    import django
+    from django.apps import AppConfig
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+
+    apps = defaultdict(lambda: defaultdict(float))
+    create = AppConfig.create.__func__
+
+    def timed_create(cls, entry):
+        with timer(apps[entry], 'create'):
+            app_config = create(cls, entry)
+        for phase in ('import_models', 'ready'):
+            setattr(app_config, phase, timed(
+                apps[entry], phase, getattr(app_config, phase)
+            ))
+        return app_config
+
+    AppConfig.create = classmethod(timed_create)
+    total = defaultdict(float)
+    try:
+        with timer(total, 'setup'):
+            django.setup()
+    finally:
+        AppConfig.create = classmethod(create)
+    with timer(total, 'urlconf'):
+        import_module(settings.ROOT_URLCONF)
+    with timer(total, 'middleware'):
+        WSGIHandler()
+    for phases in apps.values():
+        phases['total'] = sum(phases.values())
+    return {
+        'apps': {entry: dict(phases) for entry, phases in apps.items()},
+        'setup': total['setup'],
+        'urlconf': total['urlconf'],
+        'middleware': total['middleware'],
+    }
+
+
+def parse_import_times(lines: Iterable[str]) -> List[Dict]:
+    """Parse ``-X importtime`` output into records sorted by total time."""
+    modules = []
+    for line in lines:
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                'module': name,
+                'self': int(self_us) / 1e6,
+                'cumulative': int(cumulative_us) / 1e6,
+                'depth': len(indent) // 2,
+            })
+    return sorted(modules, key=lambda item: item['cumulative'], reverse=True)
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    print(json.dumps(profile_setup()))
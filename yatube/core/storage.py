@@ -0,0 +1,86 @@
+import gzip
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Tuple
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.html', '.txt', '.json', '.xml', '.ico', '.map',
+)
+REPORT_NAME = 'compression.json'
+
+
+def compress_file(path: str) -> Dict[str, int]:
+    """Write .gz and .br variants next to a file.
+
+    A variant is kept only when it is smaller than the original.
+    Returns a mapping of variant extension to its size in bytes.
+    """
+    with open(path, 'rb') as source:
+        content = source.read()
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content)
+    written = {'': len(content)}
+    for extension, compressed in variants.items():
+        if len(compressed) >= len(content):
+            continue
+        with open(path + extension, 'wb') as target:
+            target.write(compressed)
+        written[extension] = len(compressed)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Hashed static files with precompressed gzip and brotli variants."""
+
+    def post_process(
+        self, paths: Dict, dry_run: bool = False, **options
+    ) -> Iterable[Tuple[str, str, bool]]:
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        report = self.compress(sorted(
+            name for name in names
+            if name.endswith(COMPRESSIBLE_EXTENSIONS)
+        ))
+        self.write_report(report)
+
+    def compress(self, names: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """Compress files in parallel and return sizes per file."""
+        names = list(names)
+        workers = getattr(settings, 'STATIC_COMPRESS_WORKERS', None)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            sizes = executor.map(compress_file, map(self.path, names))
+            return dict(zip(names, sizes))
+
+    def write_report(self, report: Dict[str, Dict[str, int]]) -> None:
+        """Save the compression report and log the bytes saved."""
+        totals = {'files': len(report), 'original': 0, '.gz': 0, '.br': 0}
+        for sizes in report.values():
+            totals['original'] += sizes['']
+            for extension in ('.gz', '.br'):
+                totals[extension] += sizes.get(extension, sizes[''])
+        with open(self.path(REPORT_NAME), 'w') as target:
+            json.dump({'totals': totals, 'files': report}, target, indent=2)
+        for extension in ('.gz', '.br'):
+            if extension == '.br' and brotli is None:
+                continue
+            logger.info(
+                'Static %s: %d bytes saved of %d in %d files',
+                extension,
+                totals['original'] - totals[extension],
+                totals['original'],
+                totals['files'],
+            )
@@ -1,4 +1,42 @@
-from django.test import TestCase
+import gzip
+import os
+import shutil
+import tempfile
+import time
+from smtplib import SMTPException
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import OperationalError, ProgrammingError
+from django.contrib.auth import get_user_model
+from django.http import Http404
+from django.test import (Client, LiveServerTestCase, TestCase,
+                         override_settings)
+from django.urls import reverse
+
+from core.loadtest import LatencyHistogram
+from core.management.commands.warm_cache import Command as WarmCommand
+from core.mail import deliver
+from core import cachewarm, objectcache
+from core.cache import CompressedCache, check_shared_cache
+from core.cachewarm import USER_AGENT, RateLimiter, warm
+from core.middleware import find_variant
+from core.models import OutboxMessage
+from core.paginator import (EstimatedCountPaginator, is_unsupported,
+                            store_count)
+from core.profiler import make_token
+from core.startup import parse_import_times
+from core.storage import compress_file
+from core.warmup import warm_up
+from posts.models import Post
+from posts.viewcounts import view_counter
+
+User = get_user_model()
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+TEMP_PROFILER_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
 class StaticURLTests(TestCase):
@@ -7,3 +45,399 @@ class StaticURLTests(TestCase):
         """Testing unexist page return 404."""
         response = self.client.get('/unexisting_page/')
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+@override_settings(STATIC_ROOT=TEMP_STATIC_ROOT)
+class PrecompressedStaticTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.content = b'body { color: red; }\n' * 100
+        cls.name = 'site.0123456789ab.css'
+        cls.path = os.path.join(TEMP_STATIC_ROOT, cls.name)
+        with open(cls.path, 'wb') as target:
+            target.write(cls.content)
+        cls.sizes = compress_file(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def test_compress_file_writes_smaller_gzip(self):
+        """Testing that a gzip variant is written next to the file."""
+        with open(self.path + '.gz', 'rb') as source:
+            self.assertEqual(gzip.decompress(source.read()), self.content)
+        self.assertLess(self.sizes['.gz'], self.sizes[''])
+
+    def test_find_variant_respects_accept_encoding(self):
+        """Testing the variant choice by the Accept-Encoding header."""
+        self.assertEqual(
+            find_variant(self.path, 'gzip, deflate'),
+            (self.path + '.gz', 'gzip'),
+        )
+        self.assertEqual(find_variant(self.path, ''), (self.path, None))
+
+    def test_static_served_precompressed_with_far_future_cache(self):
+        """Testing that hashed static files are served precompressed."""
+        response = self.client.get(
+            settings.STATIC_URL + self.name, HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn('immutable', response['Cache-Control'])
+
+
+class WarmUpTests(TestCase):
+
+    def test_warm_up_runs_every_step(self):
+        """Testing that warm-up compiles templates and resolves URLs."""
+        timings = warm_up()
+        self.assertEqual(
+            set(timings),
+            {'compile_templates', 'resolve_urls', 'open_connections'},
+        )
+
+
+class StartupProfileTests(TestCase):
+
+    def test_parse_import_times_sorted_by_cumulative(self):
+        """Testing that -X importtime output is parsed and sorted."""
+        lines = [
+            'import time: self [us] | cumulative | imported package',
+            'import time:       120 |        120 |   posts.forms',
+            'import time:       300 |       4200 | posts.views',
+        ]
+        modules = parse_import_times(lines)
+        self.assertEqual(
+            [module['module'] for module in modules],
+            ['posts.views', 'posts.forms'],
+        )
+        self.assertEqual(modules[0]['cumulative'], 0.0042)
+        self.assertEqual(modules[1]['depth'], 1)
+
+
+@override_settings(PROFILER_DIR=TEMP_PROFILER_DIR)
+class StaffProfilerTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.user = User.objects.create_user(username='NoBody')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_PROFILER_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_staff_request_is_profiled(self):
+        """Testing that a staff request with a token is profiled."""
+        response = self.staff_client.get(
+            reverse('posts:index'),
+            HTTP_X_PROFILE_TOKEN=make_token(self.staff),
+        )
+        name = response['X-Profile']
+        self.assertIn(f'{name}.folded', response['Link'])
+        response = self.staff_client.get(
+            reverse('core:profile', args=[f'{name}.sql.json'])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'"queries"', b''.join(response.streaming_content))
+
+    def test_token_of_other_user_is_ignored(self):
+        """Testing that a request is not profiled for non-staff users."""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(
+            reverse('posts:index'), {'_profile': make_token(self.staff)}
+        )
+        self.assertFalse(response.has_header('X-Profile'))
+
+
+class LatencyHistogramTests(TestCase):
+
+    def test_percentiles_within_one_percent(self):
+        """Testing histogram percentiles keep under 1% relative error."""
+        histogram = LatencyHistogram()
+        for millisecond in range(1, 1001):
+            histogram.record(millisecond / 1000)
+        summary = histogram.summary()
+        self.assertAlmostEqual(summary['p50'], 500, delta=5)
+        self.assertAlmostEqual(summary['p99'], 990, delta=10)
+        self.assertEqual(summary['max'], 1000)
+
+
+class SmallThresholdPaginator(EstimatedCountPaginator):
+    threshold = 5
+
+
+class EstimatedCountPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        for i in range(12):
+            User.objects.create_user(username=f'user{i}')
+
+    def setUp(self):
+        cache.clear()
+        self.users = User.objects.filter(
+            username__startswith='user'
+        ).order_by('pk')
+
+    def test_small_sets_counted_exactly(self):
+        """Testing that sets under the threshold are counted exactly."""
+        paginator = EstimatedCountPaginator(self.users, 10, key='users')
+        self.assertEqual(paginator.count, 12)
+        self.assertFalse(paginator.approximate)
+
+    def test_small_table_counted_with_one_query(self):
+        """Testing that a known small table skips the statistics queries."""
+        users = User.objects.order_by('pk')
+        self.assertEqual(EstimatedCountPaginator(users, 10).count, 12)
+        with self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(users, 10).count, 12)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=5)
+    def test_threshold_read_from_settings(self):
+        """Testing that the threshold follows overridden settings."""
+        store_count('users', 100)
+        paginator = EstimatedCountPaginator(self.users, 10, key='users')
+        self.assertEqual(paginator.count, 100)
+        self.assertTrue(paginator.approximate)
+
+    def test_only_missing_statistics_are_unsupported(self):
+        """Testing that transient errors do not turn estimates off."""
+        self.assertTrue(is_unsupported(
+            OperationalError('no such table: sqlite_stat1')
+        ))
+        self.assertTrue(is_unsupported(ProgrammingError('undefined table')))
+        self.assertFalse(is_unsupported(
+            OperationalError('database is locked')
+        ))
+
+    def test_cached_count_is_approximate(self):
+        """Testing that a cached count is used without COUNT(*)."""
+        store_count('users', 100)
+        paginator = SmallThresholdPaginator(self.users, 10, key='users')
+        with self.assertNumQueries(1):
+            page = paginator.get_page(2)
+        self.assertTrue(paginator.approximate)
+        self.assertEqual(paginator.count, 100)
+        self.assertEqual(len(page), 2)
+        self.assertFalse(page.has_next())
+
+    def test_page_beyond_approximate_total_falls_back(self):
+        """Testing that pages past the real end fall back to the last one."""
+        store_count('users', 100)
+        paginator = SmallThresholdPaginator(self.users, 10, key='users')
+        page = paginator.get_page(9)
+        self.assertEqual(page.number, 2)
+        self.assertFalse(paginator.approximate)
+        self.assertEqual(paginator.count, 12)
+
+
+class FailingEmailBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise SMTPException('Mail server unavailable')
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.OutboxEmailBackend',
+    OUTBOX_DELIVERY_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        User.objects.create_user(
+            username='mailer', email='mailer@test.ru', password='Pa55word!'
+        )
+
+    def test_password_reset_goes_through_outbox(self):
+        """Testing that emails are queued and delivered by the worker."""
+        self.client.post(
+            reverse('users:password_reset_form'),
+            {'email': 'mailer@test.ru'},
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxMessage.objects.filter(sent=None).count(), 1)
+        self.assertEqual(deliver(10), {'sent': 1, 'failed': 0})
+        self.assertEqual(mail.outbox[0].to, ['mailer@test.ru'])
+        self.assertEqual(deliver(10), {'sent': 0, 'failed': 0})
+
+    def test_failed_delivery_retried_with_backoff(self):
+        """Testing that a failed message is postponed, not lost."""
+        mail.send_mail('Subject', 'Body', None, ['mailer@test.ru'])
+        with override_settings(
+            OUTBOX_DELIVERY_BACKEND='core.tests.FailingEmailBackend'
+        ), self.assertLogs('core.mail', 'WARNING'):
+            self.assertEqual(deliver(10), {'sent': 0, 'failed': 1})
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.attempts, 1)
+        self.assertGreater(message.next_attempt, message.created)
+        self.assertEqual(deliver(10), {'sent': 0, 'failed': 0})
+        OutboxMessage.objects.update(next_attempt=message.created)
+        self.assertEqual(deliver(10), {'sent': 1, 'failed': 0})
+
+
+class ObjectCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.users = [
+            User.objects.create_user(username=f'cached{i}') for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lookup_cached_until_saved(self):
+        """Testing rows are cached by pk and dropped on save."""
+        user = self.users[0]
+        objectcache.get_cached(User, pk=user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(objectcache.get_cached(User, pk=user.pk), user)
+        User.objects.get(pk=user.pk).save()
+        with self.assertNumQueries(1):
+            objectcache.get_cached(User, pk=user.pk)
+        self.assertEqual(
+            objectcache.counters()['auth.user'],
+            {'hits': 1, 'misses': 2, 'ratio': 1 / 3},
+        )
+
+    def test_unique_lookup_checks_cached_row(self):
+        """Testing a renamed user is not found under the old username."""
+        user = User.objects.get(pk=self.users[1].pk)
+        objectcache.get_cached(User, username=user.username)
+        with self.assertNumQueries(0):
+            objectcache.get_cached(User, username=user.username)
+        user.username = 'renamed'
+        user.save()
+        with self.assertRaises(Http404):
+            objectcache.get_object_or_404(User, username='cached1')
+        self.assertEqual(
+            objectcache.get_cached(User, username='renamed').pk, user.pk
+        )
+
+    def test_missing_rows_not_cached(self):
+        """Testing that every lookup of a missing row hits the database."""
+        for _ in range(2):
+            with self.assertNumQueries(1), self.assertRaises(Http404):
+                objectcache.get_object_or_404(User, pk=0)
+
+    def test_user_cached_without_password(self):
+        """Testing only the rendered user fields are kept in the cache."""
+        user = self.users[2]
+        objectcache.get_cached(User, username=user.username)
+        cached = cache.get(objectcache.ROW_KEY.format('auth.user', user.pk))
+        self.assertEqual(cached.username, user.username)
+        self.assertNotIn('password', cached.__dict__)
+
+    def test_get_many_batches_misses(self):
+        """Testing get_many loads all missing rows with one query."""
+        objectcache.get_cached(User, pk=self.users[0].pk)
+        pks = [user.pk for user in self.users] + [0]
+        with self.assertNumQueries(1):
+            found = objectcache.get_many(User, pks)
+        self.assertEqual(set(found), {user.pk for user in self.users})
+        with self.assertNumQueries(0):
+            objectcache.get_many(User, pks[:3])
+
+
+class CacheWarmTests(LiveServerTestCase):
+
+    def test_rate_limiter_spreads_calls(self):
+        """Testing that calls are spaced by the limiter interval."""
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+    def test_warm_requests_pages(self):
+        """Testing that warm_cache counts warmed and failed pages."""
+        report = warm(
+            self.live_server_url,
+            [reverse('posts:index'), reverse('about:tech'), '/missing/'],
+            workers=2, rate=0, timeout=10,
+        )
+        self.assertEqual(report['warmed'], 2)
+        self.assertEqual(report['failed'], 1)
+
+    def test_first_pages_warmed_without_page_parameter(self):
+        """Testing that page 1 is the bare feed URL visitors request."""
+        paths = WarmCommand().paths(
+            {'pages': 2, 'profiles': 0, 'posts': 0}
+        )
+        self.assertIn(reverse('posts:index'), paths)
+        self.assertIn(reverse('posts:index') + '?page=2', paths)
+        self.assertNotIn(reverse('posts:index') + '?page=1', paths)
+
+    def test_only_signed_warm_requests_skip_view_counting(self):
+        """Testing that a spoofed user agent does not skip counting."""
+        user = User.objects.create_user(username='author')
+        post = Post.objects.create(author=user, text='Warmed post')
+        url = reverse('posts:post_detail', args=[post.pk])
+        view_counter.reset()
+        self.addCleanup(view_counter.reset)
+        self.client.get(url, HTTP_X_WARM_TOKEN=cachewarm.make_token())
+        self.client.get(url, HTTP_X_WARM_TOKEN='forged')
+        self.client.get(url, HTTP_USER_AGENT=USER_AGENT)
+        self.assertEqual(view_counter.pending_views(post.pk), 2)
+
+
+class CompressedCacheTests(TestCase):
+
+    def make_cache(self, min_size) -> CompressedCache:
+        backend = CompressedCache(
+            f'compressed-{min_size}', {'OPTIONS': {'MIN_SIZE': min_size}}
+        )
+        backend.clear()
+        return backend
+
+    def test_large_values_compressed_and_restored(self):
+        """Testing values round trip and only large ones are compressed."""
+        backend = self.make_cache(100)
+        page = '<li>Пост</li>' * 100
+        values = {'page': page, 'row': {'text': page}, 'small': 'x', 'n': 1}
+        backend.set_many(values)
+        self.assertEqual(backend.get_many(list(values)), values)
+        backend.incr('n')
+        self.assertEqual(backend.get('n'), 2)
+        payload, encoding = backend.get_entry('page', accept_gzip=True)
+        self.assertEqual(encoding, 'gzip')
+        self.assertEqual(gzip.decompress(payload).decode(), page)
+        self.assertEqual(backend.get_entry('row', accept_gzip=True)[1], None)
+        self.assertEqual(backend.stats()['compressed_sets'], 2)
+
+    def test_stats_compare_modes(self):
+        """Testing compressed mode keeps the same data in less memory."""
+        stats = {}
+        for min_size in (None, 100):
+            backend = self.make_cache(min_size)
+            backend.set('page', '<li>Пост</li>' * 1000)
+            backend.get('page')
+            backend.get('missing')
+            stats[backend.stats()['mode']] = backend.stats()
+        self.assertEqual(stats['plain']['hit_ratio'], 0.5)
+        self.assertEqual(stats['compressed']['hit_ratio'], 0.5)
+        self.assertLess(
+            stats['compressed']['memory_bytes'] * 10,
+            stats['plain']['memory_bytes'],
+        )
+
+    def test_several_workers_need_shared_cache(self):
+        """Testing that LocMemCache is refused for several workers."""
+        check_shared_cache()
+        with override_settings(WEB_CONCURRENCY=4):
+            with self.assertRaises(ImproperlyConfigured):
+                check_shared_cache()
@@ -0,0 +1,14 @@
+from django.urls import path, re_path
+
+from core import views
+from core.profiler import PROFILE_NAME
+
+app_name = 'core'
+
+urlpatterns = [
+    re_path(rf'^profiles/(?P<name>{PROFILE_NAME})$', views.profile,
+            name='profile'),
+    path('ratelimits/', views.ratelimits, name='ratelimits'),
+    path('objectcache/', views.objectcache_stats, name='objectcache'),
+    path('cache/', views.cache_stats, name='cache'),
+]
@@ -1,5 +1,12 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import cache
 from django.shortcuts import render
-from django.http import HttpRequest, HttpResponse
+from django.http import (FileResponse, Http404, HttpRequest, HttpResponse,
+                         JsonResponse)
+
+from core import objectcache
+from core.profiler import profile_path
+from core.ratelimit import counters
 
 
 def page_not_found(request: HttpRequest, exception: Exception) -> HttpResponse:
@@ -26,3 +33,33 @@ def server_error(
 def csrf_failure(request: HttpRequest, reason: str = '') -> HttpResponse:
     """Custom page for 403 permission_denied_view"""
     return render(request, 'core/403csrf.html')
+
+
+@staff_member_required
+def profile(request: HttpRequest, name: str) -> HttpResponse:
+    """Download a saved request profile."""
+    path = profile_path(name)
+    if path is None:
+        raise Http404
+    return FileResponse(
+        open(path, 'rb'), as_attachment=True, content_type='text/plain'
+    )
+
+
+@staff_member_required
+def ratelimits(request: HttpRequest) -> HttpResponse:
+    """Allowed and limited requests of every rate limited view."""
+    return JsonResponse(counters())
+
+
+@staff_member_required
+def objectcache_stats(request: HttpRequest) -> HttpResponse:
+    """Hit ratio of the object cache of every cached model."""
+    return JsonResponse(objectcache.counters())
+
+
+@staff_member_required
+def cache_stats(request: HttpRequest) -> HttpResponse:
+    """Hit ratio and memory use of the default cache."""
+    stats = getattr(cache, 'stats', None)
+    return JsonResponse(stats() if stats else {})
@@ -0,0 +1,77 @@
+import logging
+import os
+import time
+from typing import Dict, Iterator, List
+
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.template.loaders.base import Loader
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def iter_template_dirs(loaders: List[Loader]) -> Iterator[str]:
+    """Yield directories searched by the loaders, unwrapping cached ones."""
+    for loader in loaders:
+        if hasattr(loader, 'loaders'):
+            yield from iter_template_dirs(loader.loaders)
+        elif hasattr(loader, 'get_dirs'):
+            yield from loader.get_dirs()
+
+
+def iter_template_names(template_dirs: Iterator[str]) -> Iterator[str]:
+    """Yield names of all templates found in the template directories."""
+    for template_dir in template_dirs:
+        for root, _, files in os.walk(template_dir):
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                yield os.path.relpath(path, template_dir).replace(os.sep, '/')
+
+
+def compile_templates() -> int:
+    """Compile every template so the cached loader keeps it."""
+    compiled = 0
+    for backend in engines.all():
+        engine = getattr(backend, 'engine', None)
+        if engine is None:
+            continue
+        for name in iter_template_names(
+            iter_template_dirs(engine.template_loaders)
+        ):
+            try:
+                engine.get_template(name)
+            except (TemplateSyntaxError, UnicodeDecodeError) as error:
+                logger.warning('Template %s is not compiled: %s', name, error)
+            else:
+                compiled += 1
+    return compiled
+
+
+def resolve_urls() -> int:
+    """Import the URLconf and build the reverse lookup tables."""
+    return len(get_resolver().reverse_dict)
+
+
+def open_connections() -> int:
+    """Open a connection for every configured database."""
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+def warm_up() -> Dict[str, float]:
+    """Prepare a fresh worker before it accepts traffic.
+
+    Returns the time in seconds spent in every step.
+    """
+    timings = {}
+    for step in (compile_templates, resolve_urls, open_connections):
+        start = time.perf_counter()
+        result = step()
+        timings[step.__name__] = time.perf_counter() - start
+        logger.info(
+            'Warm-up %s: %s in %.3fs',
+            step.__name__, result, timings[step.__name__],
+        )
+    return timings
@@ -1,9 +1,32 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR
+from django.db.models import ForeignKey, QuerySet
+from django.forms import ModelChoiceField
+from django.http import HttpRequest
 
+from core.paginator import EstimatedCountPaginator
 from posts.models import Comment, Follow, Group, Post
 
 
-class PostAdmin(admin.ModelAdmin):
+class ScalableChangeListMixin:
+    """Constant number of queries per changelist page on large tables."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_paginator(
+        self, request: HttpRequest, queryset: QuerySet, per_page: int,
+        orphans: int = 0, allow_empty_first_page: bool = True
+    ) -> EstimatedCountPaginator:
+        filters = request.GET.copy()
+        for param in (PAGE_VAR, ORDER_VAR):
+            filters.pop(param, None)
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            key=f'admin:{self.model._meta.label_lower}:{filters.urlencode()}',
+        )
+
+
+class PostAdmin(ScalableChangeListMixin, admin.ModelAdmin):
     list_display = (
         'pk',
         'text',
@@ -11,11 +34,23 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'group'
     )
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
     list_editable = ('group',)
+    raw_id_fields = ('author',)
     empty_value_display = '-пусто-'
 
+    def formfield_for_foreignkey(
+        self, db_field: ForeignKey, request: HttpRequest, **kwargs
+    ) -> ModelChoiceField:
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'group' and request is not None:
+            if not hasattr(request, '_group_choices'):
+                request._group_choices = list(field.choices)
+            field.choices = request._group_choices
+        return field
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = (
@@ -28,7 +63,21 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class CommentAdmin(ScalableChangeListMixin, admin.ModelAdmin):
+    list_display = ('pk', 'text', 'pub_date', 'author', 'post')
+    list_select_related = ('author', 'post')
+    search_fields = ('text',)
+    date_hierarchy = 'pub_date'
+    raw_id_fields = ('author', 'post')
+
+
+class FollowAdmin(ScalableChangeListMixin, admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
-admin.site.register(Comment)
-admin.site.register(Follow)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
@@ -3,3 +3,15 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self) -> None:
+        import posts.signals  # noqa: F401
+        from django.contrib.auth import get_user_model
+
+        from core.objectcache import register
+        from posts.models import Group, Post
+        register(Post)
+        register(Group)
+        register(
+            get_user_model(), ('username', 'first_name', 'last_name')
+        )
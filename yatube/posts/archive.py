@@ -0,0 +1,126 @@
+import statistics
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count
+
+from core.paginator import invalidate_count
+from posts.groups import refresh_group_stats
+from posts.models import ArchivedComment, ArchivedPost, Comment, Group, Post
+from posts.signals import batch_changes, streams_changed
+
+POST_FIELDS = ('id', 'text', 'pub_date', 'author_id', 'group_id', 'image')
+COMMENT_FIELDS = ('id', 'text', 'pub_date', 'author_id', 'post_id')
+TABLE_SIZE_QUERIES = {
+    'postgresql': 'SELECT pg_total_relation_size(%s)',
+    'sqlite': (
+        'SELECT SUM(pgsize) FROM dbstat WHERE name IN '
+        '(SELECT name FROM sqlite_master WHERE tbl_name = %s)'
+    ),
+}
+
+
+def archive_batch(before: datetime, batch_size: int) -> int:
+    """Move the oldest posts published before a date with their comments.
+
+    Returns the number of posts moved.
+    """
+    with transaction.atomic():
+        posts = list(
+            Post.objects.filter(pub_date__lt=before)
+            .order_by('pub_date', 'pk')
+            .values(*POST_FIELDS, 'author__username', 'views__views')
+            [:batch_size]
+        )
+        if not posts:
+            return 0
+        ids = [post['id'] for post in posts]
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(
+                views=post['views__views'] or 0,
+                **{field: post[field] for field in POST_FIELDS}
+            )
+            for post in posts
+        )
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(**comment)
+            for comment in Comment.objects.filter(
+                post__in=ids
+            ).order_by().values(*COMMENT_FIELDS)
+        )
+        with batch_changes():
+            Post.objects.filter(pk__in=ids).delete()
+        group_ids = {post['group_id'] for post in posts}
+        refresh_group_stats(group_ids)
+        authors = {post['author_id']: post['author__username']
+                   for post in posts}
+        slugs = Group.objects.filter(
+            pk__in=group_ids - {None}
+        ).values_list('slug', flat=True)
+        streams_changed(
+            ['all'] + [f'author:{name}' for name in authors.values()]
+            + [f'group:{slug}' for slug in slugs]
+        )
+        for key in ['index'] + [f'group:{pk}' for pk in group_ids] + [
+            f'profile:{pk}' for pk in authors
+        ]:
+            invalidate_count(key)
+    return len(posts)
+
+
+def table_size(table: str) -> Optional[int]:
+    """Bytes taken by a table with its indexes, None when unknown."""
+    sql = TABLE_SIZE_QUERIES.get(connection.vendor)
+    if sql is None:
+        return None
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    return row[0] if row else None
+
+
+def median_ms(query, runs: int = 5) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        list(query())
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def busiest_author() -> Optional[int]:
+    row = Post.objects.order_by().values('author').annotate(
+        total=Count('pk')
+    ).order_by('-total').first()
+    return row['author'] if row else None
+
+
+def report() -> Dict:
+    """Rows, sizes and feed query latency of the hot and archive tables."""
+    tables = {}
+    for model in (Post, Comment, ArchivedPost, ArchivedComment):
+        table = model._meta.db_table
+        tables[table] = {
+            'rows': model.objects.count(),
+            'bytes': table_size(table),
+        }
+    author = busiest_author()
+    latency = {
+        'index': median_ms(
+            lambda: Post.objects.select_related('author', 'group')[:10]
+        ),
+    }
+    if author is not None:
+        latency['profile'] = median_ms(
+            lambda: Post.objects.filter(author=author)
+            .select_related('group')[:10]
+        )
+        latency['profile_count'] = median_ms(
+            lambda: [Post.objects.filter(author=author).count()]
+        )
+    return {'tables': tables, 'latency_ms': latency}
@@ -0,0 +1,185 @@
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from core.cache import cached_body
+from posts.models import Group, Post, User
+
+UPDATED_KEY = 'feed_updated:{}'
+BODY_KEY = 'feed_body:{}:{}:{}'
+
+
+def stream_filters(stream: str) -> dict:
+    """Post filters of a stream named 'all', 'group:slug' or 'author:name'."""
+    kind, _, value = stream.partition(':')
+    if kind == 'group':
+        return {'group__slug': value}
+    if kind == 'author':
+        return {'author__username': value}
+    return {}
+
+
+def stream_updated(stream: str) -> Optional[datetime]:
+    """Time of the last change in a stream, None for an empty stream.
+
+    The time is kept for FEED_UPDATED_TIMEOUT. Edits and deletions leave
+    no trace in the table, so a stream whose time was lost counts as
+    changed now and its feed is rendered once more.
+    """
+    key = UPDATED_KEY.format(stream)
+    updated = cache.get(key)
+    if updated is None and Post.objects.filter(
+        **stream_filters(stream)
+    ).exists():
+        updated = timezone.now()
+        cache.set(key, updated, settings.FEED_UPDATED_TIMEOUT)
+    return updated
+
+
+def touch_streams(streams: Iterable[str]) -> None:
+    """Mark streams as changed now."""
+    now = timezone.now()
+    cache.set_many({UPDATED_KEY.format(stream): now for stream in streams},
+                   settings.FEED_UPDATED_TIMEOUT)
+
+
+def post_streams(post: Post, group_ids: Iterable[int]) -> List[str]:
+    """Streams a post appears in, including the groups it has left."""
+    slugs = Group.objects.filter(
+        pk__in=set(group_ids) - {None}
+    ).values_list('slug', flat=True)
+    return ['all', f'author:{post.author.username}'] + [
+        f'group:{slug}' for slug in slugs
+    ]
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: последние записи'
+    description = 'Последние обновления на сайте'
+
+    def link(self, obj=None) -> str:
+        return reverse('posts:index')
+
+    def items(self, obj=None):
+        return Post.objects.select_related('author')[:settings.FEED_SIZE]
+
+    def item_title(self, item: Post) -> str:
+        return item.text[:50]
+
+    def item_description(self, item: Post) -> str:
+        return item.text
+
+    def item_link(self, item: Post) -> str:
+        return reverse('posts:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item: Post) -> datetime:
+        return item.pub_date
+
+    def item_author_name(self, item: Post) -> str:
+        return item.author.get_full_name() or item.author.username
+
+
+class GroupPostsFeed(LatestPostsFeed):
+
+    def get_object(self, request: HttpRequest, slug: str) -> Group:
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj: Group) -> str:
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj: Group) -> str:
+        return obj.description
+
+    def link(self, obj: Group) -> str:
+        return reverse('posts:group', args=[obj.slug])
+
+    def items(self, obj: Group):
+        return obj.groups.select_related('author')[:settings.FEED_SIZE]
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+
+    def get_object(self, request: HttpRequest, username: str) -> User:
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj: User) -> str:
+        return f'Yatube: {obj.get_full_name() or obj.username}'
+
+    def description(self, obj: User) -> str:
+        return f'Записи пользователя {obj.username}'
+
+    def link(self, obj: User) -> str:
+        return reverse('posts:profile', args=[obj.username])
+
+    def items(self, obj: User):
+        return obj.posts.select_related('author')[:settings.FEED_SIZE]
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj: Group) -> str:
+        return obj.description
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj: User) -> str:
+        return f'Записи пользователя {obj.username}'
+
+
+def cached_feed(feed_class: type, stream: Callable[..., str]) -> Callable:
+    """Serve a feed with conditional GET and a cached body.
+
+    The body is cached per time of the last change of the stream, so it
+    is rendered again only after a post in the stream is written.
+    """
+    feed = feed_class()
+
+    def last_modified(request: HttpRequest, **kwargs) -> Optional[datetime]:
+        return stream_updated(stream(**kwargs))
+
+    def etag(request: HttpRequest, **kwargs) -> Optional[str]:
+        """Weak ETag, the gzip and plain bodies are the same content."""
+        updated = last_modified(request, **kwargs)
+        if updated is not None:
+            return f'W/"{feed_class.__name__}-{updated.timestamp()}"'
+
+    @condition(etag_func=etag, last_modified_func=last_modified)
+    def view(request: HttpRequest, **kwargs) -> HttpResponse:
+        updated = last_modified(request, **kwargs)
+        if updated is None:
+            return feed(request, **kwargs)
+        key = BODY_KEY.format(
+            feed_class.__name__, stream(**kwargs), updated.timestamp()
+        )
+        content, encoding = cached_body(request, key)
+        if content is not None:
+            response = HttpResponse(
+                content, content_type=feed_class.feed_type.content_type
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+        else:
+            response = feed(request, **kwargs)
+            cache.set(key, response.content, settings.FEED_BODY_TIMEOUT)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    return view
@@ -0,0 +1,60 @@
+import re
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.db import transaction
+
+from core.paginator import invalidate_count
+from posts.models import Follow, User
+
+SEPARATORS = re.compile(r'[\s,;]+')
+
+
+def parse_usernames(text: str) -> List[str]:
+    """Unique usernames of a list separated by spaces, commas or lines."""
+    return list(dict.fromkeys(
+        name.lstrip('@') for name in SEPARATORS.split(text) if name
+    ))
+
+
+def batches(names: List[str]) -> Iterable[List[str]]:
+    size = settings.BULK_FOLLOW_BATCH
+    for start in range(0, len(names), size):
+        yield names[start:start + size]
+
+
+def follow_many(user: User, usernames: Iterable[str]) -> Dict:
+    """Subscribe a user to many authors with one insert per batch."""
+    names = list(usernames)
+    result = {'followed': 0, 'unknown': []}
+    for batch in batches(names):
+        authors = dict(User.objects.filter(
+            username__in=batch
+        ).exclude(pk=user.pk).values_list('username', 'pk'))
+        result['unknown'] += [
+            name for name in batch
+            if name not in authors and name != user.username
+        ]
+        with transaction.atomic():
+            existing = Follow.objects.filter(user=user).count()
+            Follow.objects.bulk_create(
+                [Follow(user=user, author_id=pk) for pk in authors.values()],
+                ignore_conflicts=True,
+            )
+            result['followed'] += (
+                Follow.objects.filter(user=user).count() - existing
+            )
+    invalidate_count(f'follow:{user.pk}')
+    return result
+
+
+def unfollow_many(user: User, usernames: Iterable[str]) -> Dict:
+    """Unsubscribe a user from many authors with one delete per batch."""
+    result = {'unfollowed': 0}
+    for batch in batches(list(usernames)):
+        deleted, _ = Follow.objects.filter(
+            user=user, author__username__in=batch
+        ).delete()
+        result['unfollowed'] += deleted
+    invalidate_count(f'follow:{user.pk}')
+    return result
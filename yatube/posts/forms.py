@@ -4,10 +4,20 @@ from posts.models import Comment, Post
 
 
 class PostForm(forms.ModelForm):
+    version = forms.IntegerField(
+        widget=forms.HiddenInput, required=False, min_value=1
+    )
+
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['version'].initial = self.instance.version
+            self.fields['version'].required = True
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
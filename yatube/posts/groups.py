@@ -0,0 +1,102 @@
+from typing import Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import Group, GroupStats, Post
+
+DIRECTORY_KEY = 'group_directory:{}'
+VERSION_KEY = 'group_directory_version'
+
+
+def refresh_group_stats(group_ids: Iterable[int]) -> None:
+    """Recalculate the summary of the given groups and reset the cache.
+
+    Used by batch jobs and the repair_group_stats command, single post
+    writes go through move_post_stats().
+    """
+    group_ids = set(group_ids) - {None}
+    if not group_ids:
+        return
+    stats = {
+        row['group']: row
+        for row in Post.objects.filter(group__in=group_ids)
+        .order_by().values('group').annotate(
+            post_count=Count('pk'),
+            author_count=Count('author', distinct=True),
+            latest_post=Max('pub_date'),
+        )
+    }
+    existing = set(Group.objects.filter(
+        pk__in=group_ids
+    ).values_list('pk', flat=True))
+    for group_id in existing:
+        row = stats.get(group_id, {})
+        GroupStats.objects.update_or_create(group_id=group_id, defaults={
+            'post_count': row.get('post_count', 0),
+            'author_count': row.get('author_count', 0),
+            'latest_post': row.get('latest_post'),
+        })
+    invalidate_directory()
+
+
+def change_stats(group_id: int, post: Post, delta: int) -> None:
+    """Add (delta 1) or remove (delta -1) one post from a group summary."""
+    changes = {'post_count': F('post_count') + delta}
+    if not Post.objects.filter(
+        group_id=group_id, author_id=post.author_id
+    ).exclude(pk=post.pk).exists():
+        changes['author_count'] = F('author_count') + delta
+    stats = GroupStats.objects.filter(group_id=group_id)
+    if not stats.update(**changes):
+        refresh_group_stats([group_id])
+    elif delta > 0:
+        stats.filter(
+            Q(latest_post=None) | Q(latest_post__lt=post.pub_date)
+        ).update(latest_post=post.pub_date)
+    else:
+        stats.filter(latest_post__lte=post.pub_date).update(
+            latest_post=Subquery(Post.objects.filter(
+                group_id=OuterRef('group_id')
+            ).order_by('-pub_date').values('pub_date')[:1])
+        )
+
+
+def move_post_stats(post: Post, old_group_id: Optional[int],
+                    new_group_id: Optional[int]) -> None:
+    """Move one post between group summaries, None is no group.
+
+    Counts change by F() deltas, the latest post is looked up again only
+    when the removed post was the latest one of its group.
+    """
+    if old_group_id == new_group_id:
+        return
+    if old_group_id is not None:
+        change_stats(old_group_id, post, -1)
+    if new_group_id is not None:
+        change_stats(new_group_id, post, 1)
+    invalidate_directory()
+
+
+def invalidate_directory() -> None:
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        pass
+
+
+def group_directory() -> List[Dict]:
+    """All groups with their stats, read from the cache when possible."""
+    key = DIRECTORY_KEY.format(cache.get_or_set(VERSION_KEY, 1, None))
+    groups = cache.get(key)
+    if groups is None:
+        groups = list(Group.objects.annotate(
+            post_count=Coalesce(F('stats__post_count'), 0),
+            author_count=Coalesce(F('stats__author_count'), 0),
+            latest_post=F('stats__latest_post'),
+        ).order_by('title').values(
+            'title', 'slug', 'post_count', 'author_count', 'latest_post'
+        ))
+        cache.set(key, groups)
+    return groups
@@ -0,0 +1,134 @@
+import threading
+import time
+from bisect import bisect_right, insort
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from posts.feeds import UPDATED_KEY, stream_filters, stream_updated
+from posts.models import Post
+
+Entry = Tuple[datetime, int]
+
+
+class HeadIndex:
+    """Newest (pub_date, id) pairs of every stream kept in memory.
+
+    New posts saved by this process are added at once. Changes made by
+    other processes are noticed through the stream timestamps of the
+    feeds, which reach every worker because check_shared_cache refuses
+    per-process caches when several workers run. A stream changed after
+    it was loaded, or whose timestamp expired, is loaded again.
+    """
+
+    def __init__(self, size: int, max_streams: int) -> None:
+        self.size = size
+        self.max_streams = max_streams
+        self.heads: Dict[str, List[Entry]] = OrderedDict()
+        self.loaded: Dict[str, datetime] = {}
+        self.changed = threading.Condition()
+
+    def clear(self) -> None:
+        with self.changed:
+            self.heads.clear()
+            self.loaded.clear()
+
+    def load(self, stream: str) -> List[Entry]:
+        rows = Post.objects.filter(**stream_filters(stream)).order_by(
+            '-pub_date', '-pk'
+        ).values_list('pub_date', 'pk')[:self.size]
+        return sorted(rows)
+
+    def store(self, stream: str, head: List[Entry],
+              loaded: datetime) -> None:
+        self.heads[stream] = head
+        self.heads.move_to_end(stream)
+        self.loaded[stream] = loaded
+        while len(self.heads) > self.max_streams:
+            oldest, _ = self.heads.popitem(last=False)
+            del self.loaded[oldest]
+
+    def heads_of(self, streams: Iterable[str]) -> Dict[str, List[Entry]]:
+        """Heads of streams, loading missing and outdated ones."""
+        streams = list(streams)
+        updated = cache.get_many([UPDATED_KEY.format(s) for s in streams])
+        result = {}
+        for stream in streams:
+            touched = updated.get(UPDATED_KEY.format(stream))
+            if touched is None:
+                touched = stream_updated(stream)
+            with self.changed:
+                if stream in self.heads and (
+                    touched is None or touched <= self.loaded[stream]
+                ):
+                    self.heads.move_to_end(stream)
+                    result[stream] = self.heads[stream]
+                    continue
+            loaded = timezone.now()
+            head = self.load(stream)
+            with self.changed:
+                self.store(stream, head, loaded)
+            result[stream] = head
+        return result
+
+    def add(self, post: Post, streams: Iterable[str]) -> None:
+        """Put a new post on the heads of its loaded streams."""
+        entry = (post.pub_date, post.pk)
+        with self.changed:
+            for stream in streams:
+                head = self.heads.get(stream)
+                if head is None:
+                    continue
+                if entry not in head:
+                    insort(head, entry)
+                    del head[:-self.size]
+                self.loaded[stream] = timezone.now()
+            self.changed.notify_all()
+
+    def discard(self, streams: Iterable[str]) -> None:
+        """Forget streams whose posts were edited or deleted."""
+        with self.changed:
+            for stream in streams:
+                self.heads.pop(stream, None)
+                self.loaded.pop(stream, None)
+
+    def newer(self, streams: Iterable[str],
+              since: Entry) -> Tuple[List[Entry], bool]:
+        """Entries after since, newest first, and whether heads were short.
+
+        The second value is True when a head does not reach back to since
+        and more posts may exist than are returned.
+        """
+        entries = set()
+        truncated = False
+        for head in self.heads_of(streams).values():
+            position = bisect_right(head, since)
+            entries.update(head[position:])
+            if position == 0 and len(head) >= self.size:
+                truncated = True
+        return sorted(entries, reverse=True), truncated
+
+    def newest(self, streams: Iterable[str]) -> Optional[Entry]:
+        heads = [head for head in self.heads_of(streams).values() if head]
+        return max(head[-1] for head in heads) if heads else None
+
+    def poll(self, streams: List[str], since: Entry,
+             wait: float) -> Tuple[List[Entry], bool]:
+        """Wait up to wait seconds until a stream has posts after since."""
+        deadline = time.monotonic() + wait
+        while True:
+            entries, truncated = self.newer(streams, since)
+            remaining = deadline - time.monotonic()
+            if entries or remaining <= 0:
+                return entries, truncated
+            with self.changed:
+                self.changed.wait(
+                    min(remaining, settings.POLL_CHECK_INTERVAL)
+                )
+
+
+head_index = HeadIndex(settings.POLL_HEAD_SIZE, settings.POLL_MAX_STREAMS)
@@ -0,0 +1,43 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.paginator import refresh_statistics
+from posts.archive import archive_batch, report
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Move old posts and their comments to the archive tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='Archive posts published more than this many days ago.',
+        )
+        parser.add_argument('--batch', type=int, default=1000)
+        parser.add_argument(
+            '--report', action='store_true',
+            help='Print table sizes and feed latency before and after.',
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        result = {}
+        if options['report']:
+            result['before'] = report()
+        moved = 0
+        while True:
+            batch = archive_batch(before, options['batch'])
+            if not batch:
+                break
+            moved += batch
+            self.stderr.write(f'Archived posts: {moved}')
+        result['archived'] = moved
+        if moved:
+            refresh_statistics(Post)
+        if options['report']:
+            result['after'] = report()
+        self.stdout.write(json.dumps(result, indent=2))
@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, connections
+from django.db.models import Max, Min
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.tags import backfill_chunk
+
+
+def run_chunk(first: int, last: int) -> int:
+    try:
+        return backfill_chunk(first, last)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ('Extract hashtags of existing posts in parallel chunks. '
+            'SQLite allows one writer, so chunks run one by one there.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        bounds = Post.objects.aggregate(Min('pk'), Max('pk'))
+        if bounds['pk__min'] is None:
+            self.stdout.write('No posts to process.')
+            return
+        chunk = options['chunk']
+        starts = range(bounds['pk__min'], bounds['pk__max'] + 1, chunk)
+        if options['workers'] == 1 or connection.vendor == 'sqlite':
+            done = sum(
+                backfill_chunk(first, first + chunk - 1) for first in starts
+            )
+        else:
+            with ThreadPoolExecutor(options['workers']) as executor:
+                done = sum(executor.map(
+                    lambda first: run_chunk(first, first + chunk - 1),
+                    starts,
+                ))
+        self.stdout.write(f'Processed posts: {done}')
@@ -0,0 +1,93 @@
+import json
+import time
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+
+from posts.models import Follow, Group, Post, User
+
+
+def fetched_bytes(queryset) -> int:
+    """Bytes of the column values a queryset reads from the database."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return sum(
+            len(value) if isinstance(value, (bytes, str)) else 8
+            for row in cursor.fetchall()
+            for value in row
+            if value is not None
+        )
+
+
+def page_time(queryset, runs: int) -> float:
+    """Median milliseconds to load a page of model instances."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        list(queryset.all())
+        timings.append((time.perf_counter() - start) * 1000)
+    return median(timings)
+
+
+def busiest(queryset, field: str):
+    row = queryset.order_by().values(field).annotate(
+        total=Count('pk')
+    ).order_by('-total').first()
+    return row[field] if row else None
+
+
+class Command(BaseCommand):
+    help = ('Compare bytes fetched and time per page of full and '
+            'column-pruned feed querysets.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=3)
+        parser.add_argument('--runs', type=int, default=5)
+
+    def feeds(self):
+        full = Post.objects.select_related('author', 'group')
+        feeds = {'index': (full, Post.objects.feed())}
+        group = busiest(Post.objects.exclude(group=None), 'group')
+        if group is not None:
+            group = Group.objects.get(pk=group)
+            feeds['group'] = (
+                group.groups.select_related('author'),
+                Post.objects.feed().filter(group=group),
+            )
+        author = busiest(Post.objects, 'author')
+        if author is not None:
+            author = User.objects.get(pk=author)
+            feeds['profile'] = (
+                author.posts.select_related('group'),
+                Post.objects.feed().filter(author=author),
+            )
+        reader = busiest(Follow.objects, 'user')
+        if reader is not None:
+            feeds['follow'] = (
+                full.filter(author__following__user=reader),
+                Post.objects.feed().filter(author__following__user=reader),
+            )
+        return feeds
+
+    def handle(self, *args, **options):
+        size = settings.NUMBER_POSTS_PER_PAGE
+        report = {}
+        for name, querysets in self.feeds().items():
+            report[name] = {}
+            for mode, queryset in zip(('full', 'feed'), querysets):
+                pages = [
+                    queryset[page * size:(page + 1) * size]
+                    for page in range(options['pages'])
+                ]
+                report[name][mode] = {
+                    'bytes_per_page': sum(map(fetched_bytes, pages))
+                    / len(pages),
+                    'ms_per_page': sum(
+                        page_time(page, options['runs']) for page in pages
+                    ) / len(pages),
+                }
+        self.stdout.write(json.dumps(report, indent=2))
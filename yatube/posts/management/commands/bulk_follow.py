@@ -0,0 +1,37 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.follows import follow_many, parse_usernames, unfollow_many
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Follow or unfollow many authors on behalf of a user.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--file',
+            help='Usernames separated by spaces, commas or lines; '
+                 'stdin when omitted.',
+        )
+        parser.add_argument('--unfollow', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'No user {options["username"]}.')
+        if options['file']:
+            with open(options['file'], encoding='utf-8') as source:
+                text = source.read()
+        else:
+            text = sys.stdin.read()
+        usernames = parse_usernames(text)
+        if options['unfollow']:
+            result = unfollow_many(user, usernames)
+        else:
+            result = follow_many(user, usernames)
+        self.stdout.write(json.dumps(result, ensure_ascii=False))
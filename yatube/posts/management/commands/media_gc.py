@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from posts.mediagc import collect
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Delete post images that no post refers to and their '
+            'thumbnails.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report what would be deleted.',
+        )
+        parser.add_argument('--batch', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--min-age', type=float, default=24,
+            help='Skip files modified within this many hours, '
+                 'uploads may not be saved to a post yet.',
+        )
+
+    def handle(self, *args, **options):
+        report = collect(
+            Post._meta.get_field('image').upload_to,
+            batch_size=options['batch'],
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+            min_age=options['min_age'] * 60 * 60,
+        )
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,20 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.publish import all_paths, publish
+
+
+class Command(BaseCommand):
+    help = 'Render all public pages to static HTML in PUBLISH_ROOT.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        if not settings.PUBLISH_ROOT:
+            raise CommandError('PUBLISH_ROOT is not set.')
+        results = publish(all_paths(), options['workers'])
+        for outcome, number in sorted(Counter(results.values()).items()):
+            self.stdout.write(f'Pages {outcome}: {number}')
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from posts.groups import refresh_group_stats
+from posts.models import Group
+
+
+class Command(BaseCommand):
+    help = 'Recalculate the post, author and latest post stats of groups.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'slugs', nargs='*', help='Groups to repair, all when empty.'
+        )
+
+    def handle(self, *args, **options):
+        groups = Group.objects.all()
+        if options['slugs']:
+            groups = groups.filter(slug__in=options['slugs'])
+        group_ids = list(groups.values_list('pk', flat=True))
+        refresh_group_stats(group_ids)
+        self.stdout.write(f'Repaired groups: {len(group_ids)}')
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from posts.ranking import update_rankings
+
+
+class Command(BaseCommand):
+    help = 'Rescore posts with new activity for the popular tab.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Rescored posts: {update_rankings()}')
@@ -0,0 +1,174 @@
+"""Find and delete media files no post refers to any more.
+
+Files are streamed from disk in batches and every batch is checked
+against the database with one query, so memory use does not grow with
+the size of the media tree.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connections
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+from posts.models import ArchivedPost, Post
+
+File = Tuple[str, int]
+
+
+def iter_files(directory: str, min_age: float) -> Iterator[File]:
+    """Names relative to MEDIA_ROOT and sizes of files older than min_age."""
+    cutoff = time.time() - min_age
+    stack = [os.path.join(settings.MEDIA_ROOT, directory)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_mtime <= cutoff:
+                        name = os.path.relpath(entry.path, settings.MEDIA_ROOT)
+                        yield name.replace(os.sep, '/'), stat.st_size
+
+
+def chunked(files: Iterable[File], size: int) -> Iterator[List[File]]:
+    files = iter(files)
+    while True:
+        batch = list(islice(files, size))
+        if not batch:
+            return
+        yield batch
+
+
+def unreferenced(batch: List[File]) -> List[File]:
+    """Originals of a batch that no post or archived post uses."""
+    names = [name for name, _ in batch]
+    used = set()
+    for model in (Post, ArchivedPost):
+        used.update(
+            model.objects.filter(image__in=names)
+            .values_list('image', flat=True)
+        )
+    return [file for file in batch if file[0] not in used]
+
+
+def untracked(batch: List[File]) -> List[File]:
+    """Thumbnails of a batch that the thumbnail store has forgotten."""
+    return [
+        file for file in batch
+        if default.kvstore.get(ImageFile(file[0], default.storage)) is None
+    ]
+
+
+def thumbnails_of(name: str) -> List[File]:
+    """Thumbnail files generated from an original."""
+    source = ImageFile(name, default_storage)
+    keys = default.kvstore._get(source.key, identity='thumbnails') or []
+    thumbnails = []
+    for key in keys:
+        thumbnail = default.kvstore._get(key)
+        if thumbnail is not None and thumbnail.exists():
+            thumbnails.append(
+                (thumbnail.name, default.storage.size(thumbnail.name))
+            )
+    return thumbnails
+
+
+def delete_originals(batch: List[File]) -> None:
+    for name, _ in batch:
+        default.kvstore.delete(ImageFile(name, default_storage))
+        default_storage.delete(name)
+
+
+def delete_thumbnails(batch: List[File]) -> None:
+    for name, _ in batch:
+        default.storage.delete(name)
+
+
+class Collector:
+    """Run deletions on a thread pool with a bounded number of batches."""
+
+    def __init__(self, workers: int, dry_run: bool) -> None:
+        self.workers = workers
+        self.dry_run = dry_run
+        self.executor = ThreadPoolExecutor(workers) if workers > 1 else None
+        self.pending = set()
+        self.report = {
+            kind: {'files': 0, 'bytes': 0}
+            for kind in ('originals', 'thumbnails')
+        }
+
+    def add(self, kind: str, batch: List[File],
+            delete: Callable[[List[File]], None]) -> None:
+        self.report[kind]['files'] += len(batch)
+        self.report[kind]['bytes'] += sum(size for _, size in batch)
+        if self.dry_run or not batch:
+            return
+        if self.executor is None:
+            delete(batch)
+            return
+        if len(self.pending) >= self.workers * 2:
+            done, self.pending = wait(self.pending,
+                                      return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+        self.pending.add(self.executor.submit(self.run, delete, batch))
+
+    @staticmethod
+    def run(delete: Callable[[List[File]], None], batch: List[File]) -> None:
+        try:
+            delete(batch)
+        finally:
+            connections.close_all()
+
+    def drain(self) -> None:
+        """Wait until all submitted batches are deleted."""
+        for future in self.pending:
+            future.result()
+        self.pending = set()
+
+    def finish(self) -> Dict:
+        self.drain()
+        if self.executor is not None:
+            self.executor.shutdown()
+        return self.report
+
+
+def collect(upload_to: str, batch_size: int, workers: int, dry_run: bool,
+            min_age: float) -> Dict:
+    """Delete orphaned originals with their thumbnails, then thumbnails
+    the thumbnail store no longer knows about.
+
+    Returns the number of files and bytes reclaimed of each kind.
+    """
+    collector = Collector(workers, dry_run)
+    for batch in chunked(iter_files(upload_to, min_age), batch_size):
+        orphans = unreferenced(batch)
+        thumbnails = [
+            thumbnail for name, _ in orphans
+            for thumbnail in thumbnails_of(name)
+        ]
+        collector.report['thumbnails']['files'] += len(thumbnails)
+        collector.report['thumbnails']['bytes'] += sum(
+            size for _, size in thumbnails
+        )
+        collector.add('originals', orphans, delete_originals)
+    collector.drain()
+    for batch in chunked(
+        iter_files(thumbnail_settings.THUMBNAIL_PREFIX, min_age), batch_size
+    ):
+        collector.add('thumbnails', untracked(batch), delete_thumbnails)
+    report = collector.finish()
+    report['dry_run'] = dry_run
+    return report
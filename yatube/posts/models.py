@@ -6,9 +6,26 @@ from core.models import AutoDateModel
 User = get_user_model()
 
 
+FEED_FIELDS = (
+    'text', 'pub_date', 'image', 'author__username', 'author__first_name',
+    'author__last_name', 'group__slug',
+)
+
+
+class FeedQuerySet(models.QuerySet):
+
+    def feed(self) -> 'FeedQuerySet':
+        """Posts of list pages with only the columns they render."""
+        return self.select_related('author', 'group').only(
+            *FEED_FIELDS
+        ).order_by('-pub_date', '-pk')
+
+
 class Post(AutoDateModel):
     text = models.TextField('Текст поста', help_text="Введите текст поста")
-    pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    pub_date = models.DateTimeField(
+        'Дата публикации', auto_now_add=True, db_index=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -28,6 +45,9 @@ class Post(AutoDateModel):
         upload_to='posts/',
         blank=True
     )
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    objects = FeedQuerySet.as_manager()
 
     def __str__(self) -> str:
         return f'{self.text[:15]}'
@@ -47,7 +67,9 @@ class Group(models.Model):
 
 class Comment(AutoDateModel):
     text = models.TextField('Текст комментария')
-    pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    pub_date = models.DateTimeField(
+        'Дата публикации', auto_now_add=True, db_index=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -77,9 +99,154 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         related_name='follower',
     )
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         constraints = [models.UniqueConstraint(
             fields=['author', 'user'],
             name='unique_author_user'
         )]
+
+
+class PopularPost(models.Model):
+    """Precomputed rank of a recent post, global when group is empty."""
+    WINDOWS = (('day', 'День'), ('week', 'Неделя'))
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+    )
+    window = models.CharField(max_length=8, choices=WINDOWS)
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ('-score',)
+        indexes = [models.Index(
+            fields=['window', 'group', '-score'],
+            name='popular_rank_idx'
+        )]
+
+
+class RankingCheckpoint(models.Model):
+    """Time of the last popular posts run, kept in a single row."""
+    finished = models.DateTimeField()
+
+
+class GroupStats(models.Model):
+    """Summary of group posts kept up to date on every post write."""
+    group = models.OneToOneField(
+        Group,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='stats',
+    )
+    post_count = models.PositiveIntegerField(default=0)
+    author_count = models.PositiveIntegerField(default=0)
+    latest_post = models.DateTimeField(blank=True, null=True)
+
+
+class PostViews(models.Model):
+    """View counter of a post, written in batches by posts.viewcounts."""
+    post = models.OneToOneField(
+        Post,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='views',
+    )
+    views = models.BigIntegerField(default=0)
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self) -> str:
+        return f'#{self.name}'
+
+
+class PostTag(models.Model):
+    """Hashtag of a post with a copy of pub_date for the tag feed index."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(
+            fields=['post', 'tag'],
+            name='unique_post_tag'
+        )]
+        indexes = [models.Index(
+            fields=['tag', '-pub_date', '-post'],
+            name='tag_feed_idx'
+        )]
+
+
+class ArchivedPost(models.Model):
+    """Post moved out of the hot table, keeps its original id."""
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField('Текст поста')
+    pub_date = models.DateTimeField('Дата публикации')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+    )
+    group = models.ForeignKey(
+        'Group',
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+    )
+    image = models.ImageField('Картинка', upload_to='posts/', blank=True)
+    views = models.BigIntegerField(default=0)
+    archived = models.DateTimeField(auto_now_add=True)
+
+    objects = FeedQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('-pub_date',)
+        indexes = [models.Index(
+            fields=['author', '-pub_date'],
+            name='archived_author_idx'
+        )]
+
+    def __str__(self) -> str:
+        return f'{self.text[:15]}'
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField('Текст комментария')
+    pub_date = models.DateTimeField('Дата публикации')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+    )
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+    )
+
+    class Meta:
+        ordering = ('-pub_date',)
+
+    def __str__(self) -> str:
+        return f'{self.text}'
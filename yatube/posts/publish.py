@@ -0,0 +1,160 @@
+"""Static HTML snapshots of public pages for anonymous visitors.
+
+Pages are rendered through the full middleware stack as an anonymous
+GET request and written to PUBLISH_ROOT/<path>/index.html, so the front
+proxy can serve them for requests without a session cookie.
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.handlers.base import BaseHandler
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import reverse
+
+from posts.models import Group
+
+logger = logging.getLogger(__name__)
+
+
+def group_path(slug: str) -> str:
+    return reverse('posts:group', args=[slug])
+
+
+def post_paths(group_slugs: Iterable[str]) -> List[str]:
+    """Pages showing the posts of groups."""
+    return [reverse('posts:index')] + [group_path(s) for s in group_slugs]
+
+
+def all_paths() -> List[str]:
+    """Every published page."""
+    return [
+        reverse('posts:index'),
+        reverse('about:author'),
+        reverse('about:tech'),
+    ] + [
+        group_path(slug)
+        for slug in Group.objects.values_list('slug', flat=True)
+    ]
+
+
+def file_path(path: str) -> str:
+    return os.path.join(settings.PUBLISH_ROOT, path.strip('/'), 'index.html')
+
+
+def write_atomic(target: str, content: bytes) -> None:
+    """Replace a file so readers see either the old or the new content."""
+    directory = os.path.dirname(target)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as temp_file:
+            temp_file.write(content)
+        os.chmod(temp, 0o644)
+        os.replace(temp, target)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+class Renderer(BaseHandler):
+    """Request handler rendering pages without a web server."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.load_middleware()
+        self.factory = RequestFactory()
+
+    def render(self, path: str) -> Optional[bytes]:
+        """HTML of a page, None when the page does not exist any more.
+
+        The template fragment cache of the index is dropped first, the
+        snapshot would keep its stale posts long after it expires. The
+        page is rendered without a query, so request.GET.page is ''.
+        """
+        if path == reverse('posts:index'):
+            cache.delete(make_template_fragment_key('index_page', ['']))
+        response = self.get_response(
+            self.factory.get(path, HTTP_HOST=settings.PUBLISH_HOST)
+        )
+        if response.status_code == 200:
+            return response.content
+        if response.status_code == 404:
+            return None
+        raise RuntimeError(f'{path} answered {response.status_code}')
+
+
+def publish_path(renderer: Renderer, path: str) -> str:
+    """Write or remove the snapshot of a page, return what was done."""
+    content = renderer.render(path)
+    target = file_path(path)
+    if content is not None:
+        write_atomic(target, content)
+        return 'written'
+    if os.path.exists(target):
+        os.unlink(target)
+    return 'removed'
+
+
+def publish(paths: Iterable[str], workers: int = 1) -> Dict[str, str]:
+    """Publish pages, in parallel with more than one worker."""
+    paths = sorted(set(paths))
+    renderer = Renderer()
+    if workers == 1:
+        return {path: publish_path(renderer, path) for path in paths}
+
+    def run(path: str) -> str:
+        try:
+            return publish_path(renderer, path)
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(workers) as executor:
+        return dict(zip(paths, executor.map(run, paths)))
+
+
+class Publisher:
+    """Republish changed pages in a background thread.
+
+    Paths scheduled within PUBLISH_DELAY seconds are published together,
+    so a burst of changes renders every page once.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.wake = threading.Event()
+        self.thread = None
+
+    def schedule(self, paths: Iterable[str]) -> None:
+        with self.lock:
+            self.pending.update(paths)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+        self.wake.set()
+
+    def run(self) -> None:
+        while True:
+            self.wake.wait()
+            time.sleep(settings.PUBLISH_DELAY)
+            self.wake.clear()
+            with self.lock:
+                paths, self.pending = self.pending, set()
+            try:
+                publish(paths)
+            except Exception:
+                logger.exception('Pages are not published: %s', paths)
+            finally:
+                connections.close_all()
+
+
+publisher = Publisher()
@@ -0,0 +1,108 @@
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Set
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from posts.models import (Comment, Follow, PopularPost, Post,
+                          RankingCheckpoint)
+
+CHECKPOINT_ID = 1
+WINDOWS = {'day': timedelta(days=1), 'week': timedelta(days=7)}
+
+
+def score(activity: int, pub_date: datetime) -> float:
+    """Time-decayed score of a post.
+
+    Newer posts get a linear bonus, so older scores never need to be
+    recomputed: a post has to collect ten times more activity to stay
+    above a post published RANKING_DECAY seconds later.
+    """
+    return (
+        math.log10(1 + activity)
+        + pub_date.timestamp() / settings.RANKING_DECAY
+    )
+
+
+def active_posts(since: datetime, start: datetime) -> Set[int]:
+    """Ids of posts in the window published, commented or followed since."""
+    recent = Post.objects.filter(pub_date__gte=start)
+    if since is not None:
+        recent = recent.filter(
+            Q(pub_date__gte=since)
+            | Q(comments__pub_date__gte=since)
+            | Q(author__following__created__gte=since)
+        )
+    return set(recent.values_list('pk', flat=True).distinct())
+
+
+def activity(posts: Iterable[Post]) -> Dict[int, int]:
+    """Comments of every post plus followers of its author."""
+    posts = list(posts)
+    comments = dict(
+        Comment.objects.filter(post__in=posts)
+        .order_by().values_list('post').annotate(Count('pk'))
+    )
+    followers = dict(
+        Follow.objects.filter(author__in={post.author_id for post in posts})
+        .order_by().values_list('author').annotate(Count('pk'))
+    )
+    return {
+        post.pk: comments.get(post.pk, 0)
+        + settings.RANKING_FOLLOW_WEIGHT * followers.get(post.author_id, 0)
+        for post in posts
+    }
+
+
+def prune(window: str, start: datetime, groups: Set) -> None:
+    """Keep only the top posts of every touched ranking."""
+    rankings = PopularPost.objects.filter(window=window)
+    rankings.filter(post__pub_date__lt=start).delete()
+    for group in groups:
+        keep = rankings.filter(group=group).values_list('pk', flat=True)[
+            :settings.RANKING_SIZE
+        ]
+        rankings.filter(group=group).exclude(pk__in=list(keep)).delete()
+
+
+def update_rankings() -> int:
+    """Rescore posts with new activity since the previous run.
+
+    Returns the number of rescored posts.
+    """
+    now = timezone.now()
+    since = RankingCheckpoint.objects.filter(
+        pk=CHECKPOINT_ID
+    ).values_list('finished', flat=True).first()
+    rescored = set()
+    for window, length in WINDOWS.items():
+        start = now - length
+        posts = Post.objects.filter(pk__in=active_posts(since, start))
+        scores = activity(posts)
+        with transaction.atomic():
+            PopularPost.objects.filter(
+                window=window, post__in=list(scores)
+            ).delete()
+            rankings = []
+            for post in posts:
+                value = score(scores[post.pk], post.pub_date)
+                rankings.append(
+                    PopularPost(post=post, window=window, score=value)
+                )
+                if post.group_id:
+                    rankings.append(PopularPost(
+                        post=post, group_id=post.group_id,
+                        window=window, score=value,
+                    ))
+            PopularPost.objects.bulk_create(rankings)
+            prune(window, start, {None} | {
+                ranking.group_id for ranking in rankings
+            })
+        rescored |= set(scores)
+    RankingCheckpoint.objects.update_or_create(
+        pk=CHECKPOINT_ID, defaults={'finished': now}
+    )
+    return len(rescored)
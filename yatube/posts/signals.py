@@ -0,0 +1,98 @@
+import threading
+from contextlib import contextmanager
+from functools import partial
+from typing import Iterable, Iterator, List
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from posts.feeds import post_streams, touch_streams
+from posts.groups import invalidate_directory, move_post_stats
+from posts.heads import head_index
+from posts.models import Group, Post
+from posts.publish import post_paths, publisher
+
+
+muted = threading.local()
+
+
+@contextmanager
+def batch_changes() -> Iterator[None]:
+    """Skip per-post updates of derived data inside the block.
+
+    The caller updates them once with streams_changed() instead.
+    """
+    muted.active = True
+    try:
+        yield
+    finally:
+        muted.active = False
+
+
+def republish(group_slugs: Iterable[str]) -> None:
+    """Regenerate published pages once the transaction is committed."""
+    if settings.PUBLISH_ROOT:
+        transaction.on_commit(
+            partial(publisher.schedule, post_paths(group_slugs))
+        )
+
+
+def stream_groups(streams: List[str]) -> List[str]:
+    return [
+        stream.partition(':')[2] for stream in streams
+        if stream.startswith('group:')
+    ]
+
+
+def streams_changed(streams: List[str]) -> None:
+    """Mark streams changed for feeds, polling heads and snapshots."""
+    touch_streams(streams)
+    head_index.discard(streams)
+    republish(stream_groups(streams))
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance: Post, **kwargs) -> None:
+    """Keep the group the post was loaded with to notice moves."""
+    instance._loaded_group_id = instance.group_id
+
+
+@receiver(post_init, sender=Group)
+def remember_slug(sender, instance: Group, **kwargs) -> None:
+    instance._loaded_slug = instance.slug
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance: Post, **kwargs) -> None:
+    """Update group stats, feed timestamps and heads of post streams."""
+    if getattr(muted, 'active', False):
+        return
+    group_ids = {instance._loaded_group_id, instance.group_id}
+    update_fields = kwargs.get('update_fields')
+    if kwargs.get('created'):
+        move_post_stats(instance, None, instance.group_id)
+    elif kwargs['signal'] is post_delete:
+        move_post_stats(instance, instance._loaded_group_id, None)
+    elif update_fields is None or 'group' in update_fields:
+        move_post_stats(
+            instance, instance._loaded_group_id, instance.group_id
+        )
+    streams = post_streams(instance, group_ids)
+    if kwargs.get('created'):
+        touch_streams(streams)
+        head_index.add(instance, streams)
+        republish(stream_groups(streams))
+    else:
+        streams_changed(streams)
+    instance._loaded_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance: Group, **kwargs) -> None:
+    invalidate_directory()
+    republish({instance._loaded_slug, instance.slug})
+    instance._loaded_slug = instance.slug
@@ -0,0 +1,125 @@
+from typing import Callable, Dict, Iterator, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Model
+from django.http import Http404, HttpRequest, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.html import escape
+
+from core.cache import cached_body
+from posts.models import Group, Post, User
+
+SHARD_KEY = 'sitemap:{}:{}:{}'
+HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<{} xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+SECTIONS: Dict[str, Tuple[Model, Tuple[str, ...], Callable]] = {
+    'posts': (
+        Post, ('pk', 'pub_date'),
+        lambda pk, pub_date: (
+            reverse('posts:post_detail', args=[pk]), pub_date
+        ),
+    ),
+    'profiles': (
+        User, ('pk', 'username'),
+        lambda pk, username: (reverse('posts:profile', args=[username]), None),
+    ),
+    'groups': (
+        Group, ('pk', 'slug'),
+        lambda pk, slug: (reverse('posts:group', args=[slug]), None),
+    ),
+}
+
+
+def shard_of(pk: int) -> int:
+    """Shard n holds the primary keys in (n * size, (n + 1) * size]."""
+    return (pk - 1) // settings.SITEMAP_SHARD_SIZE
+
+
+def shard_count(model: Model) -> int:
+    """Number of fixed-size primary key ranges covering the table."""
+    last = model.objects.aggregate(Max('pk'))['pk__max'] or 0
+    size = settings.SITEMAP_SHARD_SIZE
+    return (last + size - 1) // size
+
+
+def shard_urls(section: str, shard: int, base: str) -> Iterator[str]:
+    """Stream <url> entries of a shard, reading it in keyset chunks."""
+    model, fields, location = SECTIONS[section]
+    last = shard * settings.SITEMAP_SHARD_SIZE
+    end = last + settings.SITEMAP_SHARD_SIZE
+    while True:
+        rows = list(
+            model.objects.filter(pk__gt=last, pk__lte=end)
+            .order_by('pk').values_list(*fields)[:settings.SITEMAP_CHUNK]
+        )
+        for row in rows:
+            path, lastmod = location(*row)
+            entry = f'<url><loc>{escape(base + path)}</loc>'
+            if lastmod is not None:
+                entry += f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+            yield entry + '</url>\n'
+        if len(rows) < settings.SITEMAP_CHUNK:
+            return
+        last = rows[-1][0]
+
+
+def cache_when_done(key: str, parts: Iterator[str]) -> Iterator[str]:
+    """Pass parts through and cache the whole body once it is complete."""
+    body = []
+    for part in parts:
+        body.append(part)
+        yield part
+    cache.set(key, ''.join(body), settings.SITEMAP_TIMEOUT)
+
+
+def sitemap_index(request: HttpRequest) -> StreamingHttpResponse:
+    """Sitemap index listing the shards of every section."""
+    def parts() -> Iterator[str]:
+        yield HEADER.format('sitemapindex')
+        for section, (model, _, _) in SECTIONS.items():
+            for shard in range(shard_count(model)):
+                url = request.build_absolute_uri(reverse(
+                    'posts:sitemap_shard', args=[section, shard]
+                ))
+                yield f'<sitemap><loc>{escape(url)}</loc></sitemap>\n'
+        yield '</sitemapindex>\n'
+    return StreamingHttpResponse(parts(), content_type='application/xml')
+
+
+def sitemap_shard(
+    request: HttpRequest, section: str, shard: int
+) -> StreamingHttpResponse:
+    """One shard of a section; finished shards are served from the cache."""
+    if section not in SECTIONS:
+        raise Http404
+    base = request.build_absolute_uri('/')[:-1]
+    newest = shard_count(SECTIONS[section][0]) - 1
+    if shard > newest:
+        raise Http404
+    key = SHARD_KEY.format(section, shard, base)
+    cached, encoding = None, None
+    if shard < newest:
+        cached, encoding = cached_body(request, key)
+    if cached is not None:
+        response = StreamingHttpResponse(
+            [cached], content_type='application/xml'
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def parts() -> Iterator[str]:
+        yield HEADER.format('urlset')
+        yield from shard_urls(section, shard, base)
+        yield '</urlset>\n'
+    body = parts()
+    if shard < newest:
+        body = cache_when_done(key, body)
+    response = StreamingHttpResponse(body, content_type='application/xml')
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
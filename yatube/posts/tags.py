@@ -0,0 +1,101 @@
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from posts.models import Post, PostTag, Tag
+
+HASHTAG = re.compile(r'(?<!\w)#(\w{1,100})')
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def extract_tags(text: str) -> Set[str]:
+    """Normalized hashtags of a text."""
+    return {tag.lower() for tag in HASHTAG.findall(text)}
+
+
+def tag_ids(names: Iterable[str]) -> Dict[str, int]:
+    """Ids of tags by name, creating the missing ones."""
+    names = set(names)
+    if not names:
+        return {}
+    Tag.objects.bulk_create(
+        [Tag(name=name) for name in names], ignore_conflicts=True
+    )
+    return dict(
+        Tag.objects.filter(name__in=names).values_list('name', 'pk')
+    )
+
+
+def sync_tags(post: Post) -> None:
+    """Bring the tags of a saved post in line with its text."""
+    wanted = extract_tags(post.text)
+    current = dict(
+        PostTag.objects.filter(post=post).values_list('tag__name', 'pk')
+    )
+    removed = [pk for name, pk in current.items() if name not in wanted]
+    if removed:
+        PostTag.objects.filter(pk__in=removed).delete()
+    added = tag_ids(wanted - set(current))
+    PostTag.objects.bulk_create(
+        PostTag(post=post, tag_id=tag_id, pub_date=post.pub_date)
+        for tag_id in added.values()
+    )
+
+
+def backfill_chunk(first: int, last: int) -> int:
+    """Rebuild tags of posts with primary keys in [first, last]."""
+    posts = list(
+        Post.objects.filter(pk__gte=first, pk__lte=last)
+        .values_list('pk', 'text', 'pub_date')
+    )
+    tags = {pk: extract_tags(text) for pk, text, _ in posts}
+    with transaction.atomic():
+        ids = tag_ids(set().union(*tags.values()))
+        PostTag.objects.filter(post__gte=first, post__lte=last).delete()
+        PostTag.objects.bulk_create(
+            PostTag(post_id=pk, tag_id=ids[name], pub_date=pub_date)
+            for pk, _, pub_date in posts
+            for name in tags[pk]
+        )
+    return len(posts)
+
+
+def encode_cursor(pub_date: datetime, post_id: int) -> str:
+    """Cursor of a feed position, exact to the microsecond."""
+    microseconds = (pub_date - EPOCH) // timedelta(microseconds=1)
+    return f'{microseconds}-{post_id}'
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """Feed position of a cursor, None when it is missing or invalid."""
+    try:
+        microseconds, post_id = map(int, cursor.split('-'))
+        if microseconds < 0 or post_id < 0:
+            return None
+        return EPOCH + timedelta(microseconds=microseconds), post_id
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def tag_feed(name: str, cursor: str = None) -> Tuple[List[Post], str]:
+    """One page of a tag feed after the cursor and the next cursor."""
+    post_tags = PostTag.objects.filter(tag__name=name).select_related(
+        'post__author', 'post__group'
+    ).order_by('-pub_date', '-post')
+    position = decode_cursor(cursor)
+    if position is not None:
+        pub_date, post_id = position
+        post_tags = post_tags.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, post__lt=post_id)
+        )
+    page = list(post_tags[:settings.NUMBER_POSTS_PER_PAGE + 1])
+    next_cursor = None
+    if len(page) > settings.NUMBER_POSTS_PER_PAGE:
+        page = page[:settings.NUMBER_POSTS_PER_PAGE]
+        next_cursor = encode_cursor(page[-1].pub_date, page[-1].post_id)
+    return [post_tag.post for post_tag in page], next_cursor
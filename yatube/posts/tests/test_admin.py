@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.paginator import estimate_count, refresh_statistics
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class AdminChangeListTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.user = User.objects.create_user(username='UserName')
+        cls.groups = [
+            Group.objects.create(
+                title=f'title_test_group{i}',
+                slug=f'group-test-slug{i}',
+                description='group test description',
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def add_rows(self, number: int) -> None:
+        start = User.objects.count()
+        for i in range(number):
+            author = User.objects.create_user(username=f'author{start + i}')
+            post = Post.objects.create(
+                author=author, text='X' * 20, group=self.groups[i % 3]
+            )
+            Comment.objects.create(author=author, post=post, text='Y' * 20)
+            Follow.objects.create(author=author, user=self.user)
+
+    def count_queries(self, url: str) -> int:
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.admin_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Testing the admin changelists run a constant number of queries."""
+        for model in ('post', 'comment', 'follow'):
+            with self.subTest(model=model):
+                url = reverse(f'admin:posts_{model}_changelist')
+                self.add_rows(2)
+                few = self.count_queries(url)
+                self.add_rows(8)
+                self.assertEqual(self.count_queries(url), few)
+
+    def test_estimate_count_skips_filtered_querysets(self):
+        """Testing that only unfiltered querysets are estimated."""
+        self.add_rows(2)
+        self.assertIsNone(estimate_count(Post.objects.filter(text='X')))
+        refresh_statistics(Post)
+        self.assertGreaterEqual(estimate_count(Post.objects.all()), 2)
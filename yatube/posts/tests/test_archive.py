@@ -0,0 +1,101 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.paginator import ChainedSequence, estimate_count
+from posts.archive import archive_batch
+from posts.models import ArchivedPost, Comment, Group, Post
+from posts.viewcounts import view_counter
+
+User = get_user_model()
+
+
+class ArchiveTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='UserName')
+        cls.group = Group.objects.create(
+            title='title_test_group',
+            slug='group-test-slug',
+            description='group test description',
+        )
+        cls.old = Post.objects.create(
+            author=cls.user, text='Old post', group=cls.group
+        )
+        Comment.objects.create(author=cls.user, post=cls.old, text='Old')
+        Post.objects.filter(pk=cls.old.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        cls.new = Post.objects.create(author=cls.user, text='New post')
+
+    def setUp(self):
+        self.addCleanup(view_counter.reset)
+        cache.clear()
+        out = StringIO()
+        call_command('archive_posts', report=True, stdout=out, stderr=out)
+        self.result = json.loads(out.getvalue()[out.getvalue().index('{'):])
+
+    def test_old_posts_moved_with_comments(self):
+        """Testing that only old posts leave the hot tables."""
+        self.assertEqual(self.result['archived'], 1)
+        self.assertEqual(list(Post.objects.all()), [self.new])
+        archived = ArchivedPost.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.comments.get().text, 'Old')
+        self.assertFalse(Comment.objects.exists())
+        tables = self.result['after']['tables']
+        self.assertEqual(tables['posts_archivedpost']['rows'], 1)
+
+    def test_table_estimate_refreshed_after_archive(self):
+        """Testing the estimated index size drops the archived posts."""
+        self.assertEqual(estimate_count(Post.objects.all()), 1)
+
+    def test_pending_views_follow_archived_post(self):
+        """Testing that views not yet flushed are added to the archive."""
+        post = Post.objects.create(author=self.user, text='Viewed post')
+        view_counter.record(post.pk)
+        view_counter.record(post.pk)
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        archive_batch(timezone.now() - timedelta(days=365), 10)
+        self.assertEqual(view_counter.flush(), 1)
+        self.assertEqual(ArchivedPost.objects.get(pk=post.pk).views, 2)
+
+    def test_post_detail_falls_through_to_archive(self):
+        """Testing archived posts open read-only at the same address."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.old.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['archived'])
+        self.assertEqual(response.context['posts_count'], 2)
+        self.assertContains(response, 'Old')
+
+    def test_profile_chains_archive(self):
+        """Testing the profile lists hot posts first, then archived."""
+        response = self.client.get(
+            reverse('posts:profile', args=[self.user.username])
+        )
+        self.assertEqual(response.context['posts_count'], 2)
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [self.new.pk, self.old.pk],
+        )
+
+    def test_chained_sequence_slices(self):
+        """Testing slices across the end of the first queryset."""
+        sequence = ChainedSequence(
+            User.objects.order_by('pk'), User.objects.order_by('-pk')
+        )
+        self.assertEqual(sequence[0:2], [self.user, self.user])
+        self.assertEqual(sequence[1:5], [self.user])
+        self.assertEqual(sequence.count(), 2)
@@ -0,0 +1,80 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class FeedQuerySetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Reader')
+        cls.author = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(
+            title='Test group', slug='test-slug', description='Long ' * 100,
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.author, group=cls.group, text=f'Post {i}')
+            for i in range(15)
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_feed_loads_only_rendered_columns(self):
+        """Testing that feed posts defer the columns lists do not show."""
+        post = Post.objects.feed()[0]
+        self.assertIn('version', post.get_deferred_fields())
+        self.assertIn('password', post.author.get_deferred_fields())
+        self.assertIn('description', post.group.get_deferred_fields())
+        with self.assertNumQueries(0):
+            post.author.get_full_name()
+            post.group.slug
+
+    def test_list_pages_do_not_query_per_post(self):
+        """Testing that a full page needs no more queries than a short one."""
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:follow_index'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                cache.clear()
+                with CaptureQueriesContext(connection) as few:
+                    self.authorized_client.get(url, {'page': 2})
+                cache.clear()
+                with CaptureQueriesContext(connection) as many:
+                    response = self.authorized_client.get(url)
+                self.assertEqual(len(response.context['page_obj']), 10)
+                self.assertLessEqual(len(many), len(few))
+
+    def test_bench_feeds_reports_smaller_pages(self):
+        """Testing that the benchmark reports fewer bytes for feeds."""
+        out = StringIO()
+        call_command('bench_feeds', pages=1, runs=1, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(
+            set(report), {'index', 'group', 'profile', 'follow'}
+        )
+        for name, modes in report.items():
+            with self.subTest(feed=name):
+                self.assertLess(
+                    modes['feed']['bytes_per_page'],
+                    modes['full']['bytes_per_page'],
+                )
@@ -0,0 +1,102 @@
+import gzip
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.feeds import UPDATED_KEY
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FeedsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='UserName')
+        cls.group = Group.objects.create(
+            title='title_test_group',
+            slug='group-test-slug',
+            description='group test description',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Feed post text', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_contain_posts(self):
+        """Testing that every feed lists the post."""
+        urls = [
+            reverse('posts:feed_rss'),
+            reverse('posts:feed_atom'),
+            reverse('posts:group_feed_rss', args=[self.group.slug]),
+            reverse('posts:group_feed_atom', args=[self.group.slug]),
+            reverse('posts:profile_feed_rss', args=[self.user.username]),
+            reverse('posts:profile_feed_atom', args=[self.user.username]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, 'Feed post text')
+                self.assertTrue(response.has_header('ETag'))
+
+    def test_unchanged_feed_returns_304_without_queries(self):
+        """Testing conditional GET of an unchanged feed."""
+        url = reverse('posts:group_feed_rss', args=[self.group.slug])
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(response.status_code, 304)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_cached_feed_passed_through_gzipped(self):
+        """Testing a compressed feed is sent as stored to gzip clients."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Long feed post {i} ' * 20)
+            for i in range(10)
+        )
+        url = reverse('posts:feed_rss')
+        body = self.client.get(url).content
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), body)
+        self.assertTrue(response['ETag'].startswith('W/'))
+        response = self.client.get(
+            url, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get(url).content, body)
+
+    def test_new_post_changes_feed(self):
+        """Testing that a new post in the stream regenerates the feed."""
+        url = reverse('posts:feed_rss')
+        etag = self.client.get(url)['ETag']
+        Post.objects.create(author=self.user, text='Second feed post')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Second feed post')
+
+    def test_lost_timestamp_regenerates_feed(self):
+        """Testing that a feed is rendered again once its time expires."""
+        url = reverse('posts:feed_rss')
+        etag = self.client.get(url)['ETag']
+        Post.objects.filter(author=self.user).update(text='Edited elsewhere')
+        cache.delete(UPDATED_KEY.format('all'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Edited elsewhere')
+
+    def test_unknown_group_feed_returns_404(self):
+        """Testing that the feed of an unknown group is not found."""
+        response = self.client.get(
+            reverse('posts:group_feed_rss', args=['unknown'])
+        )
+        self.assertEqual(response.status_code, 404)
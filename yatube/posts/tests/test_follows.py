@@ -0,0 +1,66 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class BulkFollowTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def bulk(self, usernames: str, action: str = 'follow') -> dict:
+        return self.authorized_client.post(
+            reverse('posts:bulk_follow'),
+            {'usernames': usernames, 'action': action},
+        ).json()
+
+    def test_bulk_follow_and_unfollow(self):
+        """Testing that a list of usernames is followed in one request."""
+        Follow.objects.create(user=self.user, author=self.authors[0])
+        result = self.bulk('author0, author1\n@author2 nobody Reader')
+        self.assertEqual(result, {'followed': 2, 'unknown': ['nobody']})
+        self.assertEqual(Follow.objects.filter(user=self.user).count(), 3)
+        result = self.bulk('author1 author2', action='unfollow')
+        self.assertEqual(result, {'unfollowed': 2})
+        self.assertEqual(
+            list(Follow.objects.filter(user=self.user).values_list(
+                'author__username', flat=True
+            )),
+            ['author0'],
+        )
+
+    def test_bulk_follow_needs_post(self):
+        """Testing the bulk endpoint rejects GET requests."""
+        response = self.authorized_client.get(reverse('posts:bulk_follow'))
+        self.assertEqual(response.status_code, 405)
+
+    def test_bulk_follow_command(self):
+        """Testing the command reads usernames from a file."""
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.txt', delete=False
+        ) as source:
+            source.write('author0\nauthor1\n')
+        self.addCleanup(os.unlink, source.name)
+        out = StringIO()
+        call_command('bulk_follow', 'Reader', file=source.name, stdout=out)
+        self.assertIn('"followed": 2', out.getvalue())
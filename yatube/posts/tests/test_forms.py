@@ -1,13 +1,19 @@
 import shutil
 import tempfile
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+from posts import views
 from posts.models import Group, Post, Comment
+from posts.viewcounts import view_counter
 
 User = get_user_model()
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -37,6 +43,8 @@ class PostCreateFormTests(TestCase):
         shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
 
     def setUp(self):
+        self.addCleanup(view_counter.reset)
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
@@ -86,6 +94,7 @@ class PostCreateFormTests(TestCase):
         post = {
             'author': self.user,
             'text': 'Z' * 40,
+            'version': self.post.version,
         }
         response = self.authorized_client.post(
             reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
@@ -105,6 +114,65 @@ class PostCreateFormTests(TestCase):
             ).exists()
         )
 
+    def test_unchanged_edit_skips_write(self):
+        """Testing that submitting an unchanged post writes nothing."""
+        url = reverse('posts:post_edit', kwargs={'post_id': self.post.id})
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.post(url, {
+                'text': self.post.text,
+                'group': self.group.pk,
+                'version': 1,
+            })
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if not query['sql'].startswith('SELECT')
+        ])
+        self.assertEqual(Post.objects.get(pk=self.post.pk).version, 1)
+
+    def test_stale_edit_conflicts(self):
+        """Testing that an edit of an outdated version gets 409."""
+        url = reverse('posts:post_edit', kwargs={'post_id': self.post.id})
+        self.authorized_client.post(url, {'text': 'First', 'version': 1})
+        self.assertEqual(Post.objects.get(pk=self.post.pk).version, 2)
+        response = self.authorized_client.post(
+            url, {'text': 'Second', 'version': 1}
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(response.context['conflict'])
+        self.assertEqual(response.context['form']['version'].value(), 2)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).text, 'First')
+
+    def test_edit_of_deleted_post_not_found(self):
+        """Testing that a post deleted during an edit gives 404."""
+        post = Post.objects.create(author=self.user, text='Deleted soon')
+        update = views.update_form_to_db
+
+        def delete_then_update(form):
+            Post.objects.filter(pk=post.pk).delete()
+            return update(form)
+
+        url = reverse('posts:post_edit', kwargs={'post_id': post.pk})
+        with mock.patch.object(
+            views, 'update_form_to_db', delete_then_update
+        ):
+            response = self.authorized_client.post(
+                url, {'text': 'Too late', 'version': 1}
+            )
+        self.assertEqual(response.status_code, 404)
+
+    def test_edit_without_version_rejected(self):
+        """Testing that an edit without the form version is not saved."""
+        url = reverse('posts:post_edit', kwargs={'post_id': self.post.id})
+        for version in ('', '0'):
+            with self.subTest(version=version):
+                response = self.authorized_client.post(
+                    url, {'text': 'Blind write', 'version': version}
+                )
+                self.assertEqual(response.status_code, 400)
+        self.assertNotEqual(
+            Post.objects.get(pk=self.post.pk).text, 'Blind write'
+        )
+
 
 class CommentCreateFormTests(TestCase):
 
@@ -123,6 +191,7 @@ class CommentCreateFormTests(TestCase):
         )
 
     def setUp(self):
+        self.addCleanup(view_counter.reset)
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
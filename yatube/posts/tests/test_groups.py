@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, GroupStats, Post
+
+User = get_user_model()
+
+
+class GroupDirectoryTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='UserName')
+        cls.user2 = User.objects.create_user(username='UserName2')
+        cls.group = Group.objects.create(
+            title='title_test_group',
+            slug='group-test-slug',
+            description='group test description',
+        )
+        cls.group2 = Group.objects.create(
+            title='title_test_group2',
+            slug='group-test-slug2',
+            description='group test description2',
+        )
+        for author in (cls.user, cls.user, cls.user2):
+            cls.post = Post.objects.create(
+                author=author, text='X' * 20, group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_stats_follow_post_writes(self):
+        """Testing that group stats are updated when posts change."""
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual((stats.post_count, stats.author_count), (3, 2))
+        self.assertEqual(stats.latest_post, self.post.pub_date)
+        post_dates = list(Post.objects.filter(
+            group=self.group
+        ).values_list('pub_date', flat=True))
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = self.group2
+        post.save()
+        stats.refresh_from_db()
+        self.assertEqual((stats.post_count, stats.author_count), (2, 1))
+        self.assertEqual(self.group2.stats.post_count, 1)
+        self.assertEqual(stats.latest_post, post_dates[1])
+        post.delete()
+        self.group2.stats.refresh_from_db()
+        self.assertEqual(self.group2.stats.post_count, 0)
+        self.assertEqual(self.group2.stats.author_count, 0)
+        self.assertIsNone(self.group2.stats.latest_post)
+
+    def test_repair_recalculates_stats(self):
+        """Testing that the repair command recounts drifted stats."""
+        GroupStats.objects.filter(group=self.group).update(
+            post_count=10, author_count=10, latest_post=None
+        )
+        call_command('repair_group_stats', stdout=StringIO())
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual((stats.post_count, stats.author_count), (3, 2))
+        self.assertEqual(stats.latest_post, self.post.pub_date)
+
+    def test_directory_page_invalidated_on_new_post(self):
+        """Testing the cached group directory is reset by a new post."""
+        response = self.client.get(reverse('posts:group_index'))
+        groups = {group['slug']: group for group in response.context[
+            'page_obj'
+        ]}
+        self.assertEqual(groups['group-test-slug']['post_count'], 3)
+        self.assertEqual(groups['group-test-slug2']['post_count'], 0)
+        Post.objects.create(author=self.user, text='Y', group=self.group2)
+        response = self.client.get(reverse('posts:group_index'))
+        self.assertContains(response, 'Записей: 1')
@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+from posts.viewcounts import view_counter
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaGCTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.addCleanup(view_counter.reset)
+        cache.clear()
+        self.post = Post.objects.create(
+            author=User.objects.create_user(username='UserName'),
+            text='Post with image',
+            image=SimpleUploadedFile('old.gif', SMALL_GIF, 'image/gif'),
+        )
+        self.client.get(reverse('posts:post_detail', args=[self.post.pk]))
+        self.old = self.post.image.path
+        self.post.image = SimpleUploadedFile('new.gif', SMALL_GIF)
+        self.post.save()
+        self.stray = os.path.join(TEMP_MEDIA_ROOT, 'cache', 'stray.jpg')
+        with open(self.stray, 'wb') as stray:
+            stray.write(b'0' * 10)
+
+    def media_gc(self, **options) -> dict:
+        out = StringIO()
+        call_command('media_gc', min_age=0, workers=1, stdout=out,
+                     **options)
+        return json.loads(out.getvalue())
+
+    def media_files(self) -> set:
+        return {
+            os.path.relpath(os.path.join(root, name), TEMP_MEDIA_ROOT)
+            for root, _, files in os.walk(TEMP_MEDIA_ROOT)
+            for name in files
+        }
+
+    def test_dry_run_reports_only(self):
+        """Testing that a dry run reports orphans and deletes nothing."""
+        files = self.media_files()
+        report = self.media_gc(dry_run=True)
+        self.assertEqual(report['originals']['files'], 1)
+        self.assertEqual(report['originals']['bytes'], len(SMALL_GIF))
+        self.assertEqual(report['thumbnails']['files'], 2)
+        self.assertEqual(self.media_files(), files)
+
+    def test_orphans_deleted_with_thumbnails(self):
+        """Testing that only files of no post are deleted."""
+        self.media_gc()
+        self.assertFalse(os.path.exists(self.old))
+        self.assertFalse(os.path.exists(self.stray))
+        self.assertEqual(
+            self.media_files(),
+            {os.path.relpath(self.post.image.path, TEMP_MEDIA_ROOT)},
+        )
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, PopularPost, Post
+from posts.ranking import activity, update_rankings
+
+User = get_user_model()
+
+
+class PopularPostsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='UserName')
+        cls.group = Group.objects.create(
+            title='title_test_group',
+            slug='group-test-slug',
+            description='group test description',
+        )
+        cls.quiet = Post.objects.create(
+            author=cls.user, text='Quiet post', group=cls.group
+        )
+        cls.discussed = Post.objects.create(
+            author=cls.user, text='Discussed post'
+        )
+        for i in range(20):
+            Comment.objects.create(
+                author=cls.user, post=cls.discussed, text=f'Comment {i}'
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rankings_order_by_activity(self):
+        """Testing that commented posts rank above newer quiet posts."""
+        self.assertEqual(update_rankings(), 2)
+        top = PopularPost.objects.filter(window='day', group=None)
+        self.assertEqual(
+            [ranking.post for ranking in top], [self.discussed, self.quiet]
+        )
+        self.assertEqual(
+            PopularPost.objects.filter(group=self.group).count(), 2
+        )
+
+    def test_activity_counts_every_comment(self):
+        """Testing that a post with N comments gets an activity of N."""
+        self.assertEqual(
+            activity([self.discussed, self.quiet]),
+            {self.discussed.pk: 20, self.quiet.pk: 0},
+        )
+
+    def test_only_active_posts_rescored(self):
+        """Testing that the next run rescores only posts with activity."""
+        update_rankings()
+        self.assertEqual(update_rankings(), 0)
+        Comment.objects.create(
+            author=self.user, post=self.quiet, text='New comment'
+        )
+        self.assertEqual(update_rankings(), 1)
+
+    def test_new_follower_rescores_author_posts(self):
+        """Testing that a new follower of the author rescores the posts."""
+        update_rankings()
+        reader = User.objects.create_user(username='Reader')
+        Follow.objects.create(user=reader, author=self.user)
+        self.assertEqual(update_rankings(), 2)
+
+    def test_checkpoint_survives_cache_clear(self):
+        """Testing that the checkpoint is kept outside of the cache."""
+        update_rankings()
+        cache.clear()
+        self.assertEqual(update_rankings(), 0)
+
+    def test_popular_page_shows_ranked_posts(self):
+        """Testing the popular page shows posts of the ranking."""
+        update_rankings()
+        response = self.client.get(reverse('posts:popular'))
+        self.assertEqual(
+            response.context['posts'], [self.discussed, self.quiet]
+        )
+        response = self.client.get(
+            reverse('posts:popular'), {'group': self.group.slug}
+        )
+        self.assertEqual(response.context['posts'], [self.quiet])
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.publish import file_path, publish
+
+User = get_user_model()
+TEMP_PUBLISH_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(PUBLISH_ROOT=TEMP_PUBLISH_ROOT)
+class PublishTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='UserName')
+        cls.group = Group.objects.create(
+            title='title_test_group',
+            slug='group-test-slug',
+            description='group test description',
+        )
+        Post.objects.create(
+            author=cls.user, text='Published post', group=cls.group
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_PUBLISH_ROOT, ignore_errors=True)
+
+    def read(self, path: str) -> str:
+        with open(file_path(path), encoding='utf-8') as page:
+            return page.read()
+
+    def test_publish_command_writes_all_pages(self):
+        """Testing that every public page is written as index.html."""
+        call_command('publish', workers=1, stdout=open(os.devnull, 'w'))
+        for path in (
+            reverse('posts:index'),
+            reverse('posts:group', args=['group-test-slug']),
+            reverse('about:author'),
+        ):
+            self.assertTrue(os.path.isfile(file_path(path)), path)
+        self.assertIn('Published post', self.read(reverse('posts:index')))
+        self.assertNotIn('Выйти', self.read(reverse('posts:index')))
+
+    def test_new_post_published_despite_fragment_cache(self):
+        """Testing a post created after a visit is on the published index."""
+        cache.clear()
+        self.client.get(reverse('posts:index'))
+        Post.objects.create(author=self.user, text='Fresh post')
+        publish([reverse('posts:index')])
+        self.assertIn('Fresh post', self.read(reverse('posts:index')))
+
+    def test_missing_page_removed(self):
+        """Testing that a page of a deleted group is unpublished."""
+        group = Group.objects.create(title='Gone', slug='gone')
+        path = reverse('posts:group', args=['gone'])
+        publish([path])
+        self.assertTrue(os.path.isfile(file_path(path)))
+        group.delete()
+        self.assertEqual(publish([path]), {path: 'removed'})
+        self.assertFalse(os.path.exists(file_path(path)))
@@ -0,0 +1,123 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.ratelimit import counters, take_token
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(RATELIMITS={'add_comment': {'user': '3/h', 'ip': '100/h'}})
+class RateLimitTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.abuser = User.objects.create_user(username='Abuser')
+        cls.user = User.objects.create_user(username='UserName')
+        cls.post = Post.objects.create(author=cls.user, text='X' * 20)
+
+    def setUp(self):
+        cache.clear()
+        self.abuser_client = Client()
+        self.abuser_client.force_login(self.abuser)
+        self.url = reverse('posts:add_comment', args=[self.post.pk])
+
+    def test_abuse_limited_while_others_keep_writing(self):
+        """Testing that one client's abuse does not limit other users."""
+        clients = []
+        for i in range(10):
+            client = Client()
+            client.force_login(User.objects.create_user(username=f'User{i}'))
+            clients.append(client)
+        statuses = []
+        for i in range(20):
+            statuses.append(self.abuser_client.post(
+                self.url, {'text': f'Spam {i}'}
+            ).status_code)
+            response = clients[i % 10].post(
+                self.url, {'text': f'Comment {i}'}
+            )
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(statuses.count(302), 3)
+        self.assertEqual(statuses.count(429), 17)
+        self.assertEqual(
+            Comment.objects.exclude(author=self.abuser).count(), 20
+        )
+        self.assertEqual(
+            counters()['add_comment'], {'allowed': 23, 'limited': 17}
+        )
+
+    def test_limited_response_has_retry_after(self):
+        """Testing the 429 response tells when to retry."""
+        for i in range(4):
+            response = self.abuser_client.post(self.url, {'text': 'Spam'})
+        self.assertEqual(response.status_code, 429)
+        self.assertTemplateUsed(response, 'core/429.html')
+        self.assertTrue(1 <= int(response['Retry-After']) <= 60 * 60)
+
+    def test_tokens_come_back_gradually(self):
+        """Testing that tokens come back slot by slot, not per window."""
+        self.assertEqual(take_token('bucket', 2, 1)[1], None)
+        time.sleep(0.5)
+        self.assertEqual(take_token('bucket', 2, 1)[1], None)
+        self.assertEqual(take_token('bucket', 2, 1), (None, 1))
+        time.sleep(0.6)
+        self.assertEqual(take_token('bucket', 2, 1)[1], None)
+        self.assertIsNotNone(take_token('bucket', 2, 1)[1])
+
+    def test_concurrent_takers_share_limit(self):
+        """Testing that parallel requests never get more than the limit."""
+        with ThreadPoolExecutor(20) as executor:
+            results = list(executor.map(
+                lambda _: take_token('bucket', 5, 60 * 60), range(20)
+            ))
+        allowed = [slot for slot, _ in results if slot is not None]
+        self.assertEqual(len(allowed), 5)
+
+    @override_settings(
+        RATELIMITS={'add_comment': {'user': '3/h', 'ip': '2/h'}},
+        RATELIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR',
+    )
+    def test_ip_refusal_gives_user_token_back(self):
+        """Testing that a request refused by ip keeps the user's token."""
+        statuses = [
+            self.abuser_client.post(
+                self.url, {'text': 'Spam'}, HTTP_X_FORWARDED_FOR='1.2.3.4'
+            ).status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(statuses, [302, 302, 429])
+        statuses = [
+            self.abuser_client.post(
+                self.url, {'text': 'Spam'}, HTTP_X_FORWARDED_FOR='5.6.7.8'
+            ).status_code
+            for _ in range(2)
+        ]
+        self.assertEqual(statuses, [302, 429])
+
+    @override_settings(
+        RATELIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR',
+        RATELIMITS={'add_comment': {'user': '100/h', 'ip': '2/h'}},
+    )
+    def test_ip_read_from_trusted_proxy_header(self):
+        """Testing that clients behind a proxy get buckets of their own."""
+        statuses = [
+            self.abuser_client.post(
+                self.url, {'text': 'Spam'},
+                HTTP_X_FORWARDED_FOR='1.2.3.4, 9.9.9.9',
+            ).status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(statuses, [302, 302, 429])
+        client = Client()
+        client.force_login(self.user)
+        response = client.post(
+            self.url, {'text': 'Comment'}, HTTP_X_FORWARDED_FOR='8.8.8.8'
+        )
+        self.assertEqual(response.status_code, 302)
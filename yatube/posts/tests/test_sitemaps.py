@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post
+from posts.sitemaps import shard_of
+
+User = get_user_model()
+
+
+@override_settings(SITEMAP_SHARD_SIZE=2, SITEMAP_CHUNK=1)
+class SitemapTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='UserName')
+        cls.posts = [
+            Post.objects.create(author=cls.user, text='X' * 20)
+            for _ in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def get_body(self, url: str) -> str:
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def shard_url(self, post: Post) -> str:
+        return reverse(
+            'posts:sitemap_shard', args=['posts', shard_of(post.pk)]
+        )
+
+    def test_index_lists_post_shards(self):
+        """Testing that the sitemap index lists a shard per key range."""
+        body = self.get_body(reverse('posts:sitemap'))
+        last = shard_of(self.posts[-1].pk)
+        for shard in range(last + 1):
+            self.assertIn(f'sitemap-posts-{shard}.xml', body)
+        self.assertNotIn(f'sitemap-posts-{last + 1}.xml', body)
+        self.assertIn('sitemap-profiles-0.xml', body)
+
+    def test_no_empty_trailing_shard(self):
+        """Testing that a last key on a shard boundary adds no shard."""
+        post = Post.objects.create(author=self.user, text='X' * 20)
+        if post.pk % 2:
+            post = Post.objects.create(author=self.user, text='X' * 20)
+        body = self.get_body(reverse('posts:sitemap'))
+        self.assertIn(f'sitemap-posts-{post.pk // 2 - 1}.xml', body)
+        self.assertNotIn(f'sitemap-posts-{post.pk // 2}.xml', body)
+        response = self.client.get(reverse(
+            'posts:sitemap_shard', args=['posts', post.pk // 2]
+        ))
+        self.assertEqual(response.status_code, 404)
+
+    def test_shards_cover_every_post(self):
+        """Testing that shards list every post once."""
+        urls = {self.shard_url(post) for post in self.posts}
+        body = ''.join(self.get_body(url) for url in urls)
+        for post in self.posts:
+            with self.subTest(post=post.pk):
+                self.assertEqual(body.count(
+                    reverse('posts:post_detail', args=[post.pk]) + '<'
+                ), 1)
+
+    def test_only_newest_shard_rebuilt(self):
+        """Testing that finished shards are served from the cache."""
+        finished = self.shard_url(self.posts[0])
+        newest = self.shard_url(self.posts[-1])
+        self.assertNotEqual(finished, newest)
+        self.get_body(finished)
+        with self.assertNumQueries(1):
+            self.get_body(finished)
+        self.get_body(newest)
+        with CaptureQueriesContext(connection) as queries:
+            self.get_body(newest)
+        self.assertGreater(len(queries), 1)
@@ -0,0 +1,94 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, PostTag
+from posts.tags import decode_cursor, extract_tags, sync_tags
+
+User = get_user_model()
+
+
+class TagsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='UserName')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def tags(self, post: Post) -> set:
+        return set(post.post_tags.values_list('tag__name', flat=True))
+
+    def test_extract_tags(self):
+        """Testing hashtags are found and normalized."""
+        self.assertEqual(
+            extract_tags('#Django и #питон, не тег: a#b #django'),
+            {'django', 'питон'},
+        )
+
+    def test_edit_updates_tags(self):
+        """Testing creating and editing a post keeps its tags in sync."""
+        self.authorized_client.post(
+            reverse('posts:post_create'), {'text': 'Пост #one #two'}
+        )
+        post = Post.objects.get(author=self.user)
+        self.assertEqual(self.tags(post), {'one', 'two'})
+        kept = PostTag.objects.get(post=post, tag__name='two').pk
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            {'text': 'Пост #two #three', 'version': post.version},
+        )
+        self.assertEqual(self.tags(post), {'two', 'three'})
+        self.assertTrue(PostTag.objects.filter(pk=kept).exists())
+
+    @override_settings(NUMBER_POSTS_PER_PAGE=2)
+    def test_tag_feed_cursor(self):
+        """Testing the tag feed pages through all posts with a cursor."""
+        posts = [
+            Post.objects.create(author=self.user, text=f'Post {i} #feed')
+            for i in range(5)
+        ]
+        for post in posts:
+            sync_tags(post)
+        seen = []
+        url = reverse('posts:tag', args=('Feed',))
+        cursor = None
+        while True:
+            response = self.client.get(url, {'cursor': cursor or ''})
+            seen += response.context['posts']
+            cursor = response.context['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, sorted(
+            posts, key=lambda post: (post.pub_date, post.pk), reverse=True
+        ))
+
+    def test_invalid_cursor_starts_from_the_top(self):
+        """Testing that malformed or out of range cursors are ignored."""
+        url = reverse('posts:tag', args=('feed',))
+        for cursor in ('99999999999999999999-1', '-5-1', '5--1', 'x-1'):
+            with self.subTest(cursor=cursor):
+                self.assertIsNone(decode_cursor(cursor))
+                response = self.client.get(url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 200)
+
+    def test_backfill_tags(self):
+        """Testing the backfill command tags existing posts."""
+        post = Post.objects.create(author=self.user, text='Old #backfill')
+        out = StringIO()
+        call_command('backfill_tags', chunk=1, workers=1, stdout=out)
+        self.assertEqual(self.tags(post), {'backfill'})
+        self.assertIn('Processed posts: 1', out.getvalue())
+
+    def test_backfill_tags_serial_on_sqlite(self):
+        """Testing SQLite backfills one chunk at a time whatever workers."""
+        post = Post.objects.create(author=self.user, text='Old #sqlite')
+        out = StringIO()
+        call_command('backfill_tags', chunk=1, workers=4, stdout=out)
+        self.assertEqual(self.tags(post), {'sqlite'})
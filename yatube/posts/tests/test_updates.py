@@ -0,0 +1,123 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.feeds import UPDATED_KEY
+from posts.heads import head_index
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class NewPostsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Reader')
+        cls.author = User.objects.create_user(username='Writer')
+        cls.group = Group.objects.create(
+            title='title_test_group',
+            slug='group-test-slug',
+            description='group test description',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        Post.objects.create(author=cls.author, text='Seen post')
+
+    def setUp(self):
+        cache.clear()
+        head_index.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def poll(self, client=None, **params) -> dict:
+        client = client or self.client
+        return client.get(reverse('posts:new_posts'), params).json()
+
+    def test_new_posts_since_cursor(self):
+        """Testing that only posts after the cursor are returned."""
+        cursor = self.poll()['cursor']
+        self.assertEqual(
+            self.poll(since=cursor), {'count': 0, 'ids': [], 'cursor': cursor}
+        )
+        posts = [
+            Post.objects.create(author=self.user, text='New post'),
+            Post.objects.create(
+                author=self.author, text='Group post', group=self.group
+            ),
+        ]
+        response = self.poll(since=cursor)
+        self.assertEqual(response['count'], 2)
+        self.assertEqual(response['ids'], [posts[1].pk, posts[0].pk])
+        group = self.poll(stream='group:group-test-slug', since=cursor)
+        self.assertEqual(group['ids'], [posts[1].pk])
+        self.assertEqual(self.poll(since=response['cursor'])['count'], 0)
+
+    def test_change_noticed_after_timestamp_expired(self):
+        """Testing that a head is reloaded once its stream time is gone."""
+        cursor = self.poll()['cursor']
+        Post.objects.bulk_create(
+            [Post(author=self.author, text='Saved by another worker')]
+        )
+        cache.delete(UPDATED_KEY.format('all'))
+        self.assertEqual(self.poll(since=cursor)['count'], 1)
+
+    def test_unknown_group_rejected(self):
+        """Testing that streams of missing groups are not loaded."""
+        response = self.client.get(
+            reverse('posts:new_posts'), {'stream': 'group:missing'}
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('group:missing', head_index.heads)
+
+    def test_follow_stream(self):
+        """Testing the follow stream needs login and has followed authors."""
+        self.assertEqual(
+            self.client.get(
+                reverse('posts:new_posts'), {'stream': 'follow'}
+            ).status_code,
+            403,
+        )
+        cursor = self.poll(self.authorized_client, stream='follow')['cursor']
+        Post.objects.create(author=self.user, text='Own post')
+        followed = Post.objects.create(author=self.author, text='Followed')
+        response = self.poll(
+            self.authorized_client, stream='follow', since=cursor
+        )
+        self.assertEqual(response['ids'], [followed.pk])
+
+    @override_settings(POLL_CHECK_INTERVAL=0.05)
+    def test_long_poll_wakes_on_new_post(self):
+        """Testing long-polling waits for a new post up to the limit."""
+        cursor = self.poll()['cursor']
+        start = time.monotonic()
+        self.assertEqual(self.poll(since=cursor, wait=0.2)['count'], 0)
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        post = Post(pk=10 ** 6, author=self.author, pub_date=timezone.now())
+        timer = threading.Timer(0.1, head_index.add, (post, ['all']))
+        timer.start()
+        response = self.poll(since=cursor, wait=5)
+        timer.join()
+        self.assertEqual(response['ids'], [post.pk])
+
+    def test_invalid_wait_and_since(self):
+        """Testing that bad wait values are rejected and bad cursors reset."""
+        cursor = self.poll()['cursor']
+        url = reverse('posts:new_posts')
+        for wait in ('nan', 'inf', '-inf', 'soon'):
+            with self.subTest(wait=wait):
+                start = time.monotonic()
+                response = self.client.get(
+                    url, {'since': cursor, 'wait': wait}
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertLess(time.monotonic() - start, 1)
+        response = self.client.get(url, {'since': cursor, 'wait': -5})
+        self.assertEqual(response.json()['count'], 0)
+        response = self.client.get(url, {'since': '99999999999999999999-1'})
+        self.assertEqual(response.json()['cursor'], cursor)
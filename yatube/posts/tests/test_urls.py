@@ -3,6 +3,7 @@ from django.test import Client, TestCase
 from django.urls import reverse
 
 from posts.models import Post, Group
+from posts.viewcounts import view_counter
 
 User = get_user_model()
 
@@ -24,6 +25,7 @@ class StaticURLTests(TestCase):
         )
 
     def setUp(self):
+        self.addCleanup(view_counter.reset)
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post, PostViews
+from posts.viewcounts import view_counter
+
+User = get_user_model()
+
+
+class ViewCounterTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='UserName')
+        cls.post = Post.objects.create(author=cls.user, text='X' * 20)
+
+    def setUp(self):
+        view_counter.reset()
+        self.addCleanup(view_counter.reset)
+
+    def test_views_collected_and_flushed_in_batch(self):
+        """Testing that views are shown at once and written on flush."""
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.context['views'], 2)
+        self.assertFalse(PostViews.objects.exists())
+        self.assertEqual(view_counter.flush(), 1)
+        self.assertEqual(PostViews.objects.get(post=self.post).views, 2)
+        response = self.client.get(url)
+        self.assertEqual(response.context['views'], 3)
+        view_counter.flush()
+        self.assertEqual(PostViews.objects.get(post=self.post).views, 3)
+        self.assertGreaterEqual(view_counter.stats['max_delay'], 0)
+
+    def test_views_of_deleted_posts_skipped(self):
+        """Testing that views of deleted posts are dropped on flush."""
+        post = Post.objects.create(author=self.user, text='Y' * 20)
+        view_counter.record(post.pk)
+        post.delete()
+        self.assertEqual(view_counter.flush(), 0)
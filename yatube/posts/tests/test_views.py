@@ -10,6 +10,7 @@ from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 from posts.models import Post, Group, Follow
+from posts.viewcounts import view_counter
 from yatube.settings import NUMBER_POSTS_PER_PAGE
 
 User = get_user_model()
@@ -54,6 +55,7 @@ class PostsPagesTests(TestCase):
         shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
 
     def setUp(self):
+        self.addCleanup(view_counter.reset)
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
@@ -1,11 +1,12 @@
 from django.urls import path
 
-from posts import views
+from posts import feeds, sitemaps, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('group/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_posts, name='group'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
@@ -17,6 +18,54 @@ urlpatterns = [
         name='add_comment'
     ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/bulk/', views.bulk_follow, name='bulk_follow'),
+    path('popular/', views.popular, name='popular'),
+    path('updates/', views.new_posts, name='new_posts'),
+    path('tag/<str:name>/', views.tag_posts, name='tag'),
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap'),
+    path(
+        'sitemap-<str:section>-<int:shard>.xml',
+        sitemaps.sitemap_shard,
+        name='sitemap_shard'
+    ),
+    path(
+        'feeds/rss/',
+        feeds.cached_feed(feeds.LatestPostsFeed, lambda: 'all'),
+        name='feed_rss'
+    ),
+    path(
+        'feeds/atom/',
+        feeds.cached_feed(feeds.LatestPostsAtomFeed, lambda: 'all'),
+        name='feed_atom'
+    ),
+    path(
+        'group/<slug:slug>/rss/',
+        feeds.cached_feed(
+            feeds.GroupPostsFeed, lambda slug: f'group:{slug}'
+        ),
+        name='group_feed_rss'
+    ),
+    path(
+        'group/<slug:slug>/atom/',
+        feeds.cached_feed(
+            feeds.GroupPostsAtomFeed, lambda slug: f'group:{slug}'
+        ),
+        name='group_feed_atom'
+    ),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.cached_feed(
+            feeds.AuthorPostsFeed, lambda username: f'author:{username}'
+        ),
+        name='profile_feed_rss'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.cached_feed(
+            feeds.AuthorPostsAtomFeed, lambda username: f'author:{username}'
+        ),
+        name='profile_feed_atom'
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
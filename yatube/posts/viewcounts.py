@@ -0,0 +1,153 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+
+from posts.models import ArchivedPost, Post, PostViews
+
+logger = logging.getLogger(__name__)
+ON_CONFLICT = (
+    'INSERT INTO {table} (post_id, views) VALUES (%s, %s) '
+    'ON CONFLICT (post_id) '
+    'DO UPDATE SET views = {table}.views + excluded.views'
+)
+UPSERTS = {
+    'postgresql': ON_CONFLICT,
+    'sqlite': ON_CONFLICT,
+    'mysql': (
+        'INSERT INTO {table} (post_id, views) VALUES (%s, %s) '
+        'ON DUPLICATE KEY UPDATE views = views + VALUES(views)'
+    ),
+}
+
+
+class ViewCounter:
+    """Collect post views in memory and write them in batched upserts.
+
+    A daemon thread flushes the views every VIEW_COUNT_FLUSH_INTERVAL
+    seconds and the rest is flushed when the process exits.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.pending: Counter = Counter()
+        self.oldest = None
+        self.flusher = None
+        self.stats = {
+            'flushes': 0, 'rows': 0, 'last_delay': 0.0, 'max_delay': 0.0,
+            'last_duration': 0.0, 'errors': 0,
+        }
+
+    def record(self, post_id: int) -> None:
+        with self.lock:
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+            self.pending[post_id] += 1
+        if self.flusher is None:
+            self.start()
+
+    def reset(self) -> None:
+        """Drop the pending views without writing them."""
+        with self.lock:
+            self.pending.clear()
+            self.oldest = None
+
+    def pending_views(self, post_id: int) -> int:
+        return self.pending.get(post_id, 0)
+
+    def start(self) -> None:
+        with self.lock:
+            if self.flusher is not None:
+                return
+            self.flusher = threading.Thread(target=self.run, daemon=True)
+        self.flusher.start()
+        atexit.register(self.flush)
+
+    def run(self) -> None:
+        while True:
+            time.sleep(settings.VIEW_COUNT_FLUSH_INTERVAL)
+            self.flush()
+            connections.close_all()
+
+    def flush(self) -> int:
+        """Write pending views to the database, return the rows written."""
+        with self.lock:
+            batch, self.pending = self.pending, Counter()
+            oldest, self.oldest = self.oldest, None
+        if not batch:
+            return 0
+        start = time.monotonic()
+        try:
+            rows = upsert(batch)
+        except DatabaseError:
+            logger.exception('Post views are not flushed')
+            with self.lock:
+                self.pending.update(batch)
+                self.oldest = min(filter(None, (oldest, self.oldest)))
+                self.stats['errors'] += 1
+            return 0
+        done = time.monotonic()
+        self.stats['flushes'] += 1
+        self.stats['rows'] += rows
+        self.stats['last_duration'] = done - start
+        self.stats['last_delay'] = done - oldest
+        self.stats['max_delay'] = max(
+            self.stats['max_delay'], self.stats['last_delay']
+        )
+        logger.info(
+            'Flushed views of %d posts in %.3fs, oldest view waited %.3fs',
+            rows, self.stats['last_duration'], self.stats['last_delay'],
+        )
+        return rows
+
+
+def upsert(batch: Dict[int, int]) -> int:
+    """Add views to the counters in one statement per batch.
+
+    Databases without an upsert statement update the existing counters
+    with F() and insert the missing ones. Views of posts archived since
+    they were recorded go to the archived post.
+    """
+    existing = set(Post.objects.filter(
+        pk__in=list(batch)
+    ).values_list('pk', flat=True))
+    rows = [(pk, views) for pk, views in batch.items() if pk in existing]
+    archived = sum(
+        ArchivedPost.objects.filter(pk=pk).update(views=F('views') + views)
+        for pk, views in batch.items() if pk not in existing
+    )
+    if not rows:
+        return archived
+    connection = connections['default']
+    table = connection.ops.quote_name(PostViews._meta.db_table)
+    with transaction.atomic():
+        if connection.vendor in UPSERTS:
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    UPSERTS[connection.vendor].format(table=table), rows
+                )
+        else:
+            PostViews.objects.bulk_create(
+                PostViews(post_id=pk, views=views) for pk, views in rows
+                if not PostViews.objects.filter(post_id=pk).update(
+                    views=F('views') + views
+                )
+            )
+    return len(rows) + archived
+
+
+view_counter = ViewCounter()
+
+
+def post_views(post: Post) -> int:
+    """Stored and not yet flushed views of a post."""
+    stored = PostViews.objects.filter(post=post).values_list(
+        'views', flat=True
+    ).first() or 0
+    return stored + view_counter.pending_views(post.pk)
@@ -1,19 +1,36 @@
+import math
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import get_object_or_404, redirect, render
+from django.core.paginator import Page
+from django.db import transaction
+from django.db.models import F, Q
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.shortcuts import redirect, render
+from django.views.decorators.http import require_POST
 
+from core.cachewarm import is_warm_request
+from core.objectcache import get_cached, get_object_or_404
+from core.paginator import ChainedSequence, EstimatedCountPaginator
+from core.ratelimit import ratelimit
+from posts.feeds import stream_filters
+from posts.follows import follow_many, parse_usernames, unfollow_many
 from posts.forms import CommentForm, PostForm
-from posts.models import Follow, Group, Post, User
+from posts.groups import group_directory
+from posts.heads import head_index
+from posts.models import (ArchivedPost, Follow, Group, PopularPost, Post,
+                          User)
+from posts.tags import decode_cursor, encode_cursor, sync_tags, tag_feed
+from posts.viewcounts import post_views, view_counter
 from yatube.settings import NUMBER_POSTS_PER_PAGE
 
 
 def index(request: HttpRequest) -> HttpResponse:
     """Home page."""
-    posts = Post.objects.select_related('group').select_related('author').all()
+    posts = Post.objects.feed()
     context = {
         'title': 'Последние обновления на сайте',
-        'page_obj': create_paginator(request, posts),
+        'page_obj': create_paginator(request, posts, 'index'),
         'index': True
     }
     template = 'posts/index.html'
@@ -23,26 +40,39 @@ def index(request: HttpRequest) -> HttpResponse:
 def group_posts(request: HttpRequest, slug: str) -> HttpResponse:
     """Page to display posts of one group."""
     group = get_object_or_404(Group, slug=slug)
-    posts = group.groups.select_related('author').all()
+    posts = Post.objects.feed().filter(group=group)
     context = {
         'group': group,
-        'page_obj': create_paginator(request, posts),
+        'page_obj': create_paginator(request, posts, f'group:{group.pk}'),
     }
     template = 'posts/group_list.html'
     return render(request, template, context)
 
 
+def group_index(request: HttpRequest) -> HttpResponse:
+    """Directory of all groups with their stats."""
+    context = {
+        'title': 'Группы',
+        'page_obj': create_paginator(request, group_directory()),
+    }
+    return render(request, 'posts/group_index.html', context)
+
+
 def profile(request: HttpRequest, username: str) -> HttpResponse:
     """User information page."""
     user = get_object_or_404(User, username=username)
-    posts = user.posts.select_related('group').all()
+    posts = ChainedSequence(
+        Post.objects.feed().filter(author=user),
+        ArchivedPost.objects.feed().filter(author=user),
+    )
     following = None
     if request.user.is_authenticated:
         sub = Follow.objects.filter(author=user, user=request.user)
         following = True if sub else False
+    page_obj = create_paginator(request, posts, f'profile:{user.pk}')
     context = {
-        'posts_count': posts.count(),
-        'page_obj': create_paginator(request, posts),
+        'posts_count': page_obj.paginator.count,
+        'page_obj': page_obj,
         'username': user,
         'following': following,
     }
@@ -51,23 +81,39 @@ def profile(request: HttpRequest, username: str) -> HttpResponse:
 
 
 def post_detail(request: HttpRequest, post_id: int) -> HttpResponse:
-    """Page to display post details."""
-    post = get_object_or_404(Post, pk=post_id)
+    """Page to display post details, archived posts included."""
+    try:
+        post = get_cached(Post, pk=post_id)
+    except Post.DoesNotExist:
+        post = get_object_or_404(ArchivedPost, pk=post_id)
+    archived = isinstance(post, ArchivedPost)
+    if archived:
+        views = post.views
+    else:
+        if not is_warm_request(request):
+            view_counter.record(post.pk)
+        views = post_views(post)
     comments = post.comments.all()
-    posts_count = post.author.posts.all().count()
+    posts_count = (
+        post.author.posts.all().count()
+        + post.author.archived_posts.all().count()
+    )
     form = CommentForm()
     context = {
         'post': post,
         'title': post.text[:29],
         'posts_count': posts_count,
+        'views': views,
         'form': form,
         'comments': comments,
+        'archived': archived,
     }
     template = 'posts/post_detail.html'
     return render(request, template, context)
 
 
 @login_required
+@ratelimit('post_create')
 def post_create(request: HttpRequest) -> HttpResponse:
     """Page to create a new post for logged in users."""
     if request.method != 'POST':
@@ -87,27 +133,44 @@ def post_create(request: HttpRequest) -> HttpResponse:
 def post_edit(request: HttpRequest, post_id: int) -> HttpResponse:
     """Page to edit a post for logged in user."""
     post = get_object_or_404(Post, pk=post_id)
-    if request.method != 'POST' and post.author == request.user:
+    if post.author != request.user:
+        return redirect('posts:post_detail', post_id=post_id)
+    if request.method != 'POST':
         form = PostForm(instance=post)
         context = {
             'form': form,
             'is_edit': True,
         }
         return render(request, 'posts/create_post.html', context)
-    if request.method != 'POST' and post.author != request.user:
-        return redirect('posts:post_detail', post_id=post_id)
     form = PostForm(
         request.POST,
         instance=post,
         files=request.FILES or None,
     )
     if form.is_valid():
-        save_form_to_db(form, request.user)
+        try:
+            update_form_to_db(form)
+        except EditConflict:
+            current = get_object_or_404(Post, pk=post_id)
+            data = request.POST.copy()
+            data['version'] = current.version
+            context = {
+                'form': PostForm(data, instance=current),
+                'is_edit': True,
+                'conflict': True,
+            }
+            return render(
+                request, 'posts/create_post.html', context, status=409
+            )
         return redirect('posts:post_detail', post_id=post_id)
-    return render(request, 'posts/create_post.html', {'form': form})
+    status = 400 if 'version' in form.errors else 200
+    return render(
+        request, 'posts/create_post.html', {'form': form}, status=status
+    )
 
 
 @login_required
+@ratelimit('add_comment')
 def add_comment(request: HttpRequest, post_id: int) -> HttpResponse:
     """Add a comment to a post by an authorized user."""
     post = get_object_or_404(Post, pk=post_id)
@@ -123,18 +186,113 @@ def add_comment(request: HttpRequest, post_id: int) -> HttpResponse:
 @login_required
 def follow_index(request):
     """"Subscription page."""
-    posts = Post.objects.filter(
-        author__following__user=request.user
-    ).select_related('group').select_related('author')
+    posts = Post.objects.feed().filter(author__following__user=request.user)
     context = {
         'title': 'Подписки',
-        'page_obj': create_paginator(request, posts),
+        'page_obj': create_paginator(
+            request, posts, f'follow:{request.user.pk}'
+        ),
         'follow': True,
     }
     return render(request, 'posts/follow.html', context)
 
 
+def popular(request: HttpRequest) -> HttpResponse:
+    """Page of the most popular recent posts."""
+    window = request.GET.get('window')
+    if window not in dict(PopularPost.WINDOWS):
+        window = PopularPost.WINDOWS[0][0]
+    group = None
+    if request.GET.get('group'):
+        group = get_object_or_404(Group, slug=request.GET['group'])
+    rankings = PopularPost.objects.filter(
+        window=window, group=group
+    ).select_related('post__author', 'post__group')
+    context = {
+        'title': 'Популярное',
+        'posts': [ranking.post for ranking in rankings],
+        'windows': PopularPost.WINDOWS,
+        'window': window,
+        'group': group,
+        'popular': True,
+    }
+    return render(request, 'posts/popular.html', context)
+
+
+def tag_posts(request: HttpRequest, name: str) -> HttpResponse:
+    """Posts with a hashtag, paged with a keyset cursor."""
+    name = name.lower()
+    posts, next_cursor = tag_feed(name, request.GET.get('cursor'))
+    context = {
+        'title': f'#{name}',
+        'tag': name,
+        'posts': posts,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'posts/tag.html', context)
+
+
+def new_posts(request: HttpRequest) -> HttpResponse:
+    """Count and ids of posts newer than the since cursor of a client.
+
+    With wait the request is held up to POLL_MAX_WAIT seconds until
+    new posts appear.
+    """
+    stream = request.GET.get('stream', 'all')
+    if stream == 'follow':
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'login required'}, status=403)
+        streams = [
+            f'author:{username}' for username in User.objects.filter(
+                following__user=request.user
+            ).values_list('username', flat=True)
+        ]
+    elif stream.startswith('group:'):
+        try:
+            get_cached(Group, slug=stream[len('group:'):])
+        except Group.DoesNotExist:
+            return JsonResponse({'error': 'unknown group'}, status=404)
+        streams = [stream]
+    elif stream == 'all':
+        streams = [stream]
+    else:
+        return JsonResponse({'error': 'unknown stream'}, status=400)
+    since = decode_cursor(request.GET.get('since'))
+    if since is None:
+        newest = head_index.newest(streams)
+        return JsonResponse({
+            'count': 0,
+            'ids': [],
+            'cursor': encode_cursor(*newest) if newest else None,
+        })
+    try:
+        wait = float(request.GET.get('wait', 0))
+    except ValueError:
+        wait = math.nan
+    if not math.isfinite(wait):
+        return JsonResponse({'error': 'invalid wait'}, status=400)
+    wait = min(max(wait, 0), settings.POLL_MAX_WAIT)
+    entries, truncated = head_index.poll(streams, since, wait)
+    count = len(entries)
+    if truncated:
+        pub_date, post_id = since
+        posts = Post.objects.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=post_id)
+        )
+        if stream == 'follow':
+            posts = posts.filter(author__following__user=request.user)
+        else:
+            posts = posts.filter(**stream_filters(stream))
+        count = posts.count()
+    return JsonResponse({
+        'count': count,
+        'ids': [post_id for _, post_id in entries],
+        'cursor': encode_cursor(*(entries[0] if entries else since)),
+    })
+
+
 @login_required
+@ratelimit('profile_follow', methods=('GET', 'POST'))
 def profile_follow(request, username):
     """Add author to subscriptions."""
     user = get_object_or_404(User, username=username)
@@ -156,6 +314,22 @@ def profile_unfollow(request, username):
     return redirect('posts:profile', username=username)
 
 
+@login_required
+@require_POST
+@ratelimit('bulk_follow')
+def bulk_follow(request: HttpRequest) -> HttpResponse:
+    """Follow or unfollow a list of usernames at once."""
+    usernames = parse_usernames(request.POST.get('usernames', ''))
+    if len(usernames) > settings.BULK_FOLLOW_LIMIT:
+        return JsonResponse(
+            {'error': f'at most {settings.BULK_FOLLOW_LIMIT} usernames'},
+            status=400,
+        )
+    if request.POST.get('action') == 'unfollow':
+        return JsonResponse(unfollow_many(request.user, usernames))
+    return JsonResponse(follow_many(request.user, usernames))
+
+
 def save_form_to_db(form: PostForm, user: User) -> None:
     """"Save post to DB."""
     post = form.save(commit=False)
@@ -163,10 +337,42 @@ def save_form_to_db(form: PostForm, user: User) -> None:
     post.group = form.cleaned_data['group']
     post.author = user
     post.save()
+    sync_tags(post)
+
+
+class EditConflict(Exception):
+    """The post was changed by someone else since the form was loaded."""
+
+
+def update_form_to_db(form: PostForm) -> bool:
+    """Save only the changed fields of an edited post.
+
+    Returns False without a write when nothing changed. Raises
+    EditConflict when the post version is newer than the form's one.
+    """
+    post = form.instance
+    changed = [
+        name for name in form.changed_data if name in form.Meta.fields
+    ]
+    if not changed:
+        return False
+    expected = form.cleaned_data['version']
+    with transaction.atomic():
+        if not Post.objects.filter(pk=post.pk, version=expected).update(
+            version=F('version') + 1
+        ):
+            raise EditConflict
+        post.version = expected + 1
+        post.save(update_fields=changed + ['version'])
+        if 'text' in changed:
+            sync_tags(post)
+    return True
 
 
-def create_paginator(request: HttpRequest, posts: Post) -> Paginator:
-    """Create paginator"""
-    paginator = Paginator(posts, NUMBER_POSTS_PER_PAGE)
+def create_paginator(
+    request: HttpRequest, posts: Post, key: str = None
+) -> Page:
+    """Create paginator, key names the feed for its cached count."""
+    paginator = EstimatedCountPaginator(posts, NUMBER_POSTS_PER_PAGE, key=key)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
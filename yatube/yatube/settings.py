@@ -31,10 +31,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.PrecompressedStaticMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.StaffProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -42,12 +44,20 @@ MIDDLEWARE = [
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -66,6 +76,7 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 60)),
     }
 }
 
@@ -99,17 +110,72 @@ USE_TZ = True
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache.CompressedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+        'OPTIONS': {
+            'BACKEND': os.getenv(
+                'CACHE_BACKEND',
+                'django.core.cache.backends.locmem.LocMemCache',
+            ),
+            'MIN_SIZE': 1024,
+        },
     }
 }
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STATICFILES_STORAGE = os.getenv(
+    'STATICFILES_STORAGE',
+    'django.contrib.staticfiles.storage.StaticFilesStorage',
+)
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'users:logout'
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = 'core.mail.OutboxEmailBackend'
+OUTBOX_DELIVERY_BACKEND = os.getenv(
+    'OUTBOX_DELIVERY_BACKEND',
+    'django.core.mail.backends.filebased.EmailBackend',
+)
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_DELAY = 30
+OUTBOX_MAX_RETRY_DELAY = 60 * 60
+OUTBOX_LEASE = 10 * 60
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 NUMBER_POSTS_PER_PAGE = 10
+ESTIMATED_COUNT_THRESHOLD = 10000
+FEED_COUNT_REFRESH = 60
+FEED_COUNT_TIMEOUT = 60 * 60
+RANKING_SIZE = 100
+FEED_SIZE = 20
+FEED_BODY_TIMEOUT = 60 * 60 * 24
+FEED_UPDATED_TIMEOUT = 60 * 60 * 24
+SITEMAP_SHARD_SIZE = 50000
+SITEMAP_CHUNK = 2000
+SITEMAP_TIMEOUT = 60 * 60 * 24
+VIEW_COUNT_FLUSH_INTERVAL = 5
+RANKING_DECAY = 45000
+RANKING_FOLLOW_WEIGHT = 0.1
+PROFILER_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILER_TOKEN_MAX_AGE = 60 * 60
+WARM_TOKEN_MAX_AGE = 60 * 60
+OBJECT_CACHE_TIMEOUT = 60 * 5
+POLL_HEAD_SIZE = 200
+POLL_MAX_STREAMS = 1000
+POLL_MAX_WAIT = 25
+POLL_CHECK_INTERVAL = 1
+PUBLISH_ROOT = os.getenv('PUBLISH_ROOT')
+PUBLISH_HOST = os.getenv('PUBLISH_HOST', 'localhost')
+PUBLISH_DELAY = 1
+BULK_FOLLOW_BATCH = 500
+BULK_FOLLOW_LIMIT = 5000
+RATELIMIT_IP_HEADER = os.getenv('RATELIMIT_IP_HEADER')
+RATELIMITS = {
+    'post_create': {'user': '10/m', 'ip': '60/m'},
+    'add_comment': {'user': '20/m', 'ip': '120/m'},
+    'profile_follow': {'user': '30/m', 'ip': '120/m'},
+    'bulk_follow': {'user': '10/h', 'ip': '60/h'},
+}